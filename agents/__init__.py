@@ -1,12 +1,14 @@
 """Agent components for answering and validating questions."""
 
 from agents.gemini_client import GeminiClient
+from agents.semantic_cache import SemanticCache
 from agents.answerer_agent import AnswererAgent, AnswererResponse
 from agents.validator_agent import ValidatorAgent, ValidatorResponse
 from agents.multi_agent_validator import MultiAgentValidator, ValidationResult
 
 __all__ = [
     "GeminiClient",
+    "SemanticCache",
     "AnswererAgent",
     "AnswererResponse",
     "ValidatorAgent",
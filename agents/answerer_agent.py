@@ -1,14 +1,97 @@
 """Answerer Agent for analyzing questions and selecting answers."""
 
+import asyncio
+import functools
 import logging
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Tuple
 from agents.gemini_client import GeminiClient
+from agents.semantic_cache import SemanticCache, canonical_text, question_cache_key
 from models.schemas import QuestionItem
 
 
 logger = logging.getLogger(__name__)
 
 
+# Matches the "SELECTED:" and "REASONING:" lines of a response
+_FIELD_RE = re.compile(r"^[ \t]*(SELECTED|REASONING):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+# Matches a complete (newline-terminated) "SELECTED:" or "REASONING:" line
+_COMPLETE_FIELD_RE = re.compile(r"^[ \t]*(SELECTED|REASONING):[^\n]*\n", re.MULTILINE)
+
+# Matches the numbered "SELECTED_N:" and "REASONING_N:" lines of a batched response
+_BATCH_FIELD_RE = re.compile(r"^[ \t]*(SELECTED|REASONING)_(\d+):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+# Static instructions shared by every answerer request, registered as a cached prompt prefix
+ANSWERER_SYSTEM_PROMPT = """You are an expert at analyzing multiple-choice questions and selecting the best answer.
+
+Each request contains the question content, the question title and the available answers as a lettered list.
+It may also contain your previous selection and a validator's criticism of it; if so, reconsider your answer based on this feedback.
+
+Task: Select the single best answer from the available answers. Provide your selection and brief reasoning.
+
+Format your response as:
+SELECTED: [letter only - A, B, C, or D]
+REASONING: [your explanation]
+"""
+
+# Static instructions for answering several numbered questions in one request
+ANSWERER_BATCH_SYSTEM_PROMPT = """You are an expert at analyzing multiple-choice questions and selecting the best answer.
+
+Each request contains several questions, each introduced by a marker "Q<N>:" and followed by its content, title and available answers as a lettered list.
+
+Task: For every question, select the single best answer from its available answers. Provide your selection and brief reasoning.
+
+Format your response with one pair of lines per question, where N is the question's number:
+SELECTED_N: [letter only - A, B, C, or D]
+REASONING_N: [your explanation]
+"""
+
+# Output token cap for one answer (a letter plus brief reasoning)
+_MAX_OUTPUT_TOKENS = 256
+
+# Letters used to label answer options (A, B, C, D, etc.)
+_LETTERS = "ABCDEFGH"
+
+# Per-question part of the prompt
+_ANSWERER_TEMPLATE = """Question Content:
+{content}
+
+Question Title:
+{title}
+
+Available Answers:
+{answer_list}
+"""
+
+# Appended when the answerer is asked to reconsider
+_RECONSIDERATION_TEMPLATE = """
+Previous Selection: {previous_answer}
+Validator Criticism: {criticism}
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_base_prompt(content: str, title: str, answers: Tuple[str, ...]) -> str:
+    """
+    Render the question block of the prompt, reused across reconsideration iterations.
+    
+    Keyed on the raw texts, so canonicalization only runs on a cache miss.
+    """
+    # Format answer options as lettered list (A, B, C, D, etc.)
+    answer_list = "\n".join(f"{_LETTERS[i]}. {canonical_text(answer)}" for i, answer in enumerate(answers))
+    return _ANSWERER_TEMPLATE.format(
+        content=canonical_text(content),
+        title=canonical_text(title),
+        answer_list=answer_list
+    )
+
+
+def _has_complete_answer(text: str) -> bool:
+    """Check whether a partial response already contains complete SELECTED and REASONING lines."""
+    return {match.group(1) for match in _COMPLETE_FIELD_RE.finditer(text)} == {"SELECTED", "REASONING"}
+
+
 class AnswererResponse:
     """Response from the Answerer Agent."""
     
@@ -27,14 +110,18 @@ class AnswererResponse:
 class AnswererAgent:
     """Agent responsible for analyzing questions and selecting answers."""
     
-    def __init__(self, gemini_client: GeminiClient):
+    def __init__(self, gemini_client: GeminiClient, cache: Optional[SemanticCache] = None):
         """
         Initialize the Answerer Agent.
         
         Args:
             gemini_client: The Gemini API client to use for generating responses
+            cache: Optional question-level cache for first-pass answers
         """
         self.gemini_client = gemini_client
+        self.cache = cache
+        self.cached_content = gemini_client.register_prompt_prefix(ANSWERER_SYSTEM_PROMPT)
+        self.batch_cached_content = gemini_client.register_prompt_prefix(ANSWERER_BATCH_SYSTEM_PROMPT)
         logger.info("AnswererAgent initialized")
     
     def _build_prompt(
@@ -44,7 +131,10 @@ class AnswererAgent:
         criticism: Optional[str] = None
     ) -> str:
         """
-        Build the prompt for the answerer agent.
+        Build the per-question part of the answerer prompt.
+        
+        The static instructions live in ANSWERER_SYSTEM_PROMPT. Question text is
+        canonicalized so repeated questions render byte-identical prompts.
         
         Args:
             question: The question to analyze
@@ -54,37 +144,18 @@ class AnswererAgent:
         Returns:
             The formatted prompt string
         """
-        # Format answer options as lettered list (A, B, C, D, etc.)
-        letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-        answer_list = "\n".join([f"{letters[i]}. {answer.content}" for i, answer in enumerate(question.answers)])
-        
-        prompt = f"""You are an expert at analyzing multiple-choice questions and selecting the best answer.
-
-Question Content:
-{question.content}
-
-Question Title:
-{question.title}
-
-Available Answers:
-{answer_list}
-"""
+        prompt = _build_base_prompt(
+            question.content,
+            question.title,
+            tuple(answer.content for answer in question.answers)
+        )
         
         # Add reconsideration context if this is a retry
         if previous_answer and criticism:
-            prompt += f"""
-Previous Selection: {previous_answer}
-Validator Criticism: {criticism}
-Please reconsider your answer based on this feedback.
-"""
-        
-        prompt += """
-Task: Select the single best answer from the options above. Provide your selection and brief reasoning.
-
-Format your response as:
-SELECTED: [letter only - A, B, C, or D]
-REASONING: [your explanation]
-"""
+            prompt += _RECONSIDERATION_TEMPLATE.format(
+                previous_answer=previous_answer,
+                criticism=criticism
+            )
         
         return prompt
     
@@ -101,16 +172,9 @@ REASONING: [your explanation]
         Raises:
             ValueError: If response cannot be parsed
         """
-        lines = response_text.strip().split('\n')
-        selected_answer = None
-        reasoning = None
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("SELECTED:"):
-                selected_answer = line[len("SELECTED:"):].strip()
-            elif line.startswith("REASONING:"):
-                reasoning = line[len("REASONING:"):].strip()
+        fields = {match.group(1): match.group(2) for match in _FIELD_RE.finditer(response_text)}
+        selected_answer = fields.get("SELECTED")
+        reasoning = fields.get("REASONING")
         
         if not selected_answer:
             raise ValueError("Could not extract SELECTED from response")
@@ -119,7 +183,50 @@ REASONING: [your explanation]
         
         return AnswererResponse(selected_answer=selected_answer, reasoning=reasoning)
     
-    def answer_question(
+    def _parse_batch_response(self, response_text: str, count: int) -> List[Optional[AnswererResponse]]:
+        """
+        Parse a batched response into one answer per question.
+        
+        Args:
+            response_text: The raw response from the Gemini API
+            count: Number of questions in the batch
+            
+        Returns:
+            AnswererResponse per question, or None where it could not be parsed
+        """
+        fields: Dict[Tuple[str, int], str] = {
+            (match.group(1), int(match.group(2))): match.group(3)
+            for match in _BATCH_FIELD_RE.finditer(response_text)
+        }
+        responses: List[Optional[AnswererResponse]] = []
+        for n in range(1, count + 1):
+            selected_answer = fields.get(("SELECTED", n))
+            reasoning = fields.get(("REASONING", n))
+            if selected_answer and reasoning:
+                responses.append(AnswererResponse(selected_answer=selected_answer, reasoning=reasoning))
+            else:
+                responses.append(None)
+        return responses
+    
+    async def cached_answer(self, question: QuestionItem) -> Optional[AnswererResponse]:
+        """
+        Look up a cached first-pass answer without calling the API.
+        
+        Args:
+            question: The question to look up
+            
+        Returns:
+            The cached AnswererResponse, or None on a miss or without a cache
+        """
+        if self.cache is None:
+            return None
+        cached = await asyncio.to_thread(self.cache.get, "answerer", question_cache_key(question))
+        if cached is None:
+            return None
+        logger.info(f"Question {question.questionNumber}: Using cached answer '{cached[0]}'")
+        return AnswererResponse(selected_answer=cached[0], reasoning=cached[1])
+    
+    async def answer_question(
         self,
         question: QuestionItem,
         previous_answer: Optional[str] = None,
@@ -141,13 +248,30 @@ REASONING: [your explanation]
         """
         logger.info(f"Answering question {question.questionNumber}")
         
+        # Serve first-pass answers from the cache; reconsiderations always hit the API
+        cache_key = None
+        if self.cache is not None and not (previous_answer or criticism):
+            cached = await self.cached_answer(question)
+            if cached is not None:
+                return cached
+            cache_key = question_cache_key(question)
+        
         # Build the prompt
         prompt = self._build_prompt(question, previous_answer, criticism)
-        logger.debug(f"Answerer prompt: {prompt}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Answerer prompt: %s", prompt)
         
         # Get response from Gemini
-        response_text = self.gemini_client.generate_response(prompt)
-        logger.debug(f"Answerer response: {response_text}")
+        # Stop generating once both fields are complete; only their first lines are parsed
+        response_text = await self.gemini_client.generate_response(
+            prompt,
+            cached_content=self.cached_content,
+            stop_when=_has_complete_answer,
+            max_output_tokens=_MAX_OUTPUT_TOKENS,
+            validate=self._parse_response
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Answerer response: %s", response_text)
         
         # Parse the response
         try:
@@ -155,7 +279,44 @@ REASONING: [your explanation]
             logger.info(
                 f"Question {question.questionNumber}: Selected '{parsed_response.selected_answer}'"
             )
+            if cache_key is not None:
+                await asyncio.to_thread(
+                    self.cache.set,
+                    "answerer",
+                    cache_key,
+                    (parsed_response.selected_answer, parsed_response.reasoning)
+                )
             return parsed_response
         except ValueError as e:
             logger.error(f"Failed to parse answerer response: {e}")
             raise
+    
+    async def answer_questions_batch(self, questions: List[QuestionItem]) -> List[Optional[AnswererResponse]]:
+        """
+        Answer several questions with a single API call.
+        
+        Args:
+            questions: The questions to analyze
+            
+        Returns:
+            AnswererResponse per question (in order), or None where the answer could not be parsed
+            
+        Raises:
+            Exception: If the API call fails
+        """
+        logger.info(f"Answering batch of {len(questions)} questions")
+        
+        prompt = "\n".join(
+            f"Q{n}:\n{self._build_prompt(question)}" for n, question in enumerate(questions, start=1)
+        )
+        response_text = await self.gemini_client.generate_response(
+            prompt,
+            cached_content=self.batch_cached_content,
+            max_output_tokens=_MAX_OUTPUT_TOKENS * len(questions)
+        )
+        
+        responses = self._parse_batch_response(response_text, len(questions))
+        missing = sum(response is None for response in responses)
+        if missing:
+            logger.warning(f"Could not parse {missing} of {len(questions)} batched answers")
+        return responses
@@ -1,14 +1,38 @@
 """Gemini API client with retry logic and error handling."""
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
-import time
-from typing import Optional
-import google.generativeai as genai
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+from aiolimiter import AsyncLimiter
 
 
 logger = logging.getLogger(__name__)
 
 
+# Gemini REST API root
+GEMINI_API_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# HTTP status codes that indicate a transient failure worth retrying
+_TRANSIENT_STATUS_CODES = frozenset({429, 500, 503, 504})
+
+# Transient status codes meaning the quota or capacity is exhausted, retried with longer backoff
+_RATE_LIMIT_STATUS_CODES = frozenset({429, 503})
+
+
+def _is_transient(error: Exception) -> bool:
+    """Check whether an API error is transient (rate limiting, server or network failure)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _TRANSIENT_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
 class GeminiClient:
     """Client for interacting with Google Gemini API with retry logic."""
     
@@ -16,83 +40,434 @@ class GeminiClient:
         self,
         api_key: str,
         model: str = "gemini-2.5-pro",
+        embedding_model: str = "text-embedding-004",
         max_retries: int = 3,
         base_retry_delay_ms: int = 1000,
-        retry_multiplier: int = 2
+        retry_multiplier: int = 2,
+        rate_limit_max_retries: int = 8,
+        rate_limit_base_delay_ms: int = 2000,
+        validation_max_retries: int = 2,
+        response_cache_size: int = 1024,
+        context_cache_ttl_seconds: int = 3600,
+        request_timeout_seconds: float = 30.0,
+        max_connections: int = 64,
+        http_client: Optional[httpx.AsyncClient] = None,
+        requests_per_minute: Optional[int] = None,
+        temperature: float = 0.0,
+        thinking_budget: Optional[int] = 128
     ):
         """
         Initialize the Gemini API client.
         
         Args:
             api_key: Gemini API authentication key
-            model: Model name to use (default: gemini-2.0-flash-exp)
-            max_retries: Maximum number of retry attempts (default: 3)
+            model: Model name to use (default: gemini-2.5-pro)
+            embedding_model: Model name used by embed_text (default: text-embedding-004)
+            max_retries: Maximum number of attempts on server or network errors (default: 3)
             base_retry_delay_ms: Base delay in milliseconds for retries (default: 1000)
             retry_multiplier: Multiplier for exponential backoff (default: 2)
+            rate_limit_max_retries: Maximum retries after rate limiting (429, 503) (default: 8)
+            rate_limit_base_delay_ms: Base delay in milliseconds for rate limit retries (default: 2000)
+            validation_max_retries: Maximum immediate reprompts after an unusable response (default: 2)
+            response_cache_size: Maximum number of cached responses, 0 disables caching (default: 1024)
+            context_cache_ttl_seconds: Lifetime of server-side cached prompt prefixes (default: 3600)
+            request_timeout_seconds: Timeout for a single API request (default: 30)
+            max_connections: Maximum pooled HTTP connections (default: 64)
+            http_client: Shared HTTP client to send requests with, closed by its owner
+                (default: a client owned by this instance, sized by max_connections)
+            requests_per_minute: Rate limit for API calls across all callers (default: unlimited)
+            temperature: Sampling temperature (default: 0)
+            thinking_budget: Thinking tokens allowed per call, None for the model default (default: 128)
         """
         self.api_key = api_key
         self.model_name = model
+        self.embedding_model = embedding_model
         self.max_retries = max_retries
         self.base_retry_delay_ms = base_retry_delay_ms
         self.retry_multiplier = retry_multiplier
+        self.rate_limit_max_retries = rate_limit_max_retries
+        self.rate_limit_base_delay_ms = rate_limit_base_delay_ms
+        self.validation_max_retries = validation_max_retries
         
-        # Configure the API
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(self.model_name)
+        # Exact-match LRU cache of responses keyed by sha256(model + prompt)
+        self.response_cache_size = response_cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Registered static prompt prefixes and their server-side cached content names, keyed by handle
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self._prompt_prefixes: Dict[str, str] = {}
+        self._cached_content_names: Dict[str, str] = {}
+        
+        # Generation settings shared by every call, pre-built per output token cap
+        self.thinking_budget = thinking_budget
+        self._base_generation_config: Dict[str, Any] = {"temperature": temperature, "topP": 1}
+        if thinking_budget is not None:
+            self._base_generation_config["thinkingConfig"] = {"thinkingBudget": thinking_budget}
+        self._generation_configs: Dict[Optional[int], Dict[str, Any]] = {None: self._base_generation_config}
+        
+        # Shared rate limiter smoothing calls to the Gemini quota
+        self._limiter = (
+            AsyncLimiter(requests_per_minute, 60) if requests_per_minute else contextlib.nullcontext()
+        )
+        
+        # Shared HTTP/2 client: concurrent requests multiplex over pooled connections
+        self._headers = {"x-goog-api-key": self.api_key}
+        self._owns_http = http_client is None
+        self._http = http_client if http_client is not None else httpx.AsyncClient(
+            http2=True,
+            timeout=request_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
         
         logger.info(f"GeminiClient initialized with model: {self.model_name}")
     
-    def generate_response(self, prompt: str) -> str:
+    @property
+    def cache_stats(self) -> Dict[str, float]:
+        """Return response cache statistics (hits, misses, size, hit_rate)."""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self._cache),
+            "hit_rate": self.cache_hits / total if total else 0.0
+        }
+    
+    def register_prompt_prefix(self, system_instruction: str) -> str:
+        """
+        Register a static prompt prefix shared by many requests.
+        
+        Requests made with the returned handle send the prefix as a system
+        instruction, or reference it as cached content once
+        create_cached_contents has registered it with Gemini.
+        
+        Args:
+            system_instruction: The static instructions to prepend to every prompt
+        
+        Returns:
+            Handle to pass as cached_content to generate_response
+        """
+        handle = hashlib.sha256(system_instruction.encode()).hexdigest()[:16]
+        self._prompt_prefixes[handle] = system_instruction
+        return handle
+    
+    async def create_cached_contents(self) -> int:
+        """
+        Store every registered prompt prefix with Gemini's context caching API.
+        
+        Cached prefix tokens are billed at the cached rate and skip prefill.
+        Prefixes that cannot be cached (e.g. below the model's minimum
+        cacheable size) keep being sent as a system instruction, which still
+        lets Gemini apply implicit prefix caching.
+        
+        Returns:
+            Number of prompt prefixes now stored as cached content
+        """
+        for handle, system_instruction in self._prompt_prefixes.items():
+            try:
+                response = await self._http.post(
+                    f"{GEMINI_API_BASE_URL}/cachedContents",
+                    headers=self._headers,
+                    json={
+                        "model": f"models/{self.model_name}",
+                        "systemInstruction": {"parts": [{"text": system_instruction}]},
+                        "ttl": f"{self.context_cache_ttl_seconds}s"
+                    }
+                )
+                response.raise_for_status()
+                name = response.json()["name"]
+                self._cached_content_names[handle] = name
+                logger.info(f"Registered cached content {name} for prompt prefix {handle}")
+            except Exception as e:
+                self._cached_content_names.pop(handle, None)
+                logger.info(f"Context caching unavailable for prompt prefix {handle}, using system instruction: {e}")
+        return len(self._cached_content_names)
+    
+    async def extend_cached_contents(self) -> int:
+        """
+        Reset the TTL of every cached content registered by create_cached_contents.
+        
+        Only prefixes that were actually cached are touched, and the existing
+        entries are extended in place rather than duplicated. A prefix whose
+        entry cannot be extended (e.g. it already expired) falls back to being
+        sent as a system instruction.
+        
+        Returns:
+            Number of prompt prefixes still stored as cached content
+        """
+        for handle, name in list(self._cached_content_names.items()):
+            try:
+                response = await self._http.patch(
+                    f"{GEMINI_API_BASE_URL}/{name}",
+                    headers=self._headers,
+                    params={"updateMask": "ttl"},
+                    json={"ttl": f"{self.context_cache_ttl_seconds}s"}
+                )
+                response.raise_for_status()
+                logger.debug("Extended cached content %s for prompt prefix %s", name, handle)
+            except Exception as e:
+                self._cached_content_names.pop(handle, None)
+                logger.warning(f"Could not extend cached content {name}, using system instruction: {e}")
+        return len(self._cached_content_names)
+    
+    async def embed_text(self, text: str) -> List[float]:
+        """
+        Embed a text with the Gemini embedding model.
+        
+        Args:
+            text: The text to embed
+        
+        Returns:
+            The embedding vector
+        
+        Raises:
+            httpx.HTTPError: If the API call fails
+        """
+        async with self._limiter:
+            response = await self._http.post(
+                f"{GEMINI_API_BASE_URL}/models/{self.embedding_model}:embedContent",
+                headers=self._headers,
+                json={"content": {"parts": [{"text": text}]}}
+            )
+        response.raise_for_status()
+        return response.json()["embedding"]["values"]
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this instance owns it."""
+        if self._owns_http:
+            await self._http.aclose()
+    
+    def _cache_key(self, prompt: str, cached_content: Optional[str] = None) -> str:
+        """Build the response cache key for a prompt and optional prompt prefix."""
+        return hashlib.sha256(
+            f"{self.model_name}\0{cached_content or ''}\0{prompt}".encode()
+        ).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached response, marking it as most recently used."""
+        with self._cache_lock:
+            text = self._cache.get(key)
+            if text is None:
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return text
+    
+    def _cache_put(self, key: str, text: str) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.response_cache_size:
+                self._cache.popitem(last=False)
+    
+    def _generation_config(self, max_output_tokens: Optional[int]) -> Dict[str, Any]:
+        """
+        Get the generation config for an output token cap.
+        
+        Thinking tokens count towards maxOutputTokens, so the thinking budget
+        is added on top of the cap for the visible response. Without a thinking
+        budget the model's default thinking has no known size, so no cap is sent
+        rather than one thinking could exhaust before any visible text.
+        """
+        if self.thinking_budget is None:
+            return self._base_generation_config
+        config = self._generation_configs.get(max_output_tokens)
+        if config is None:
+            config = {
+                **self._base_generation_config,
+                "maxOutputTokens": max_output_tokens + self.thinking_budget
+            }
+            self._generation_configs[max_output_tokens] = config
+        return config
+    
+    def _build_request_body(
+        self,
+        prompt: str,
+        cached_content: Optional[str] = None,
+        max_output_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build the generateContent request body for a prompt, optional prompt prefix and output cap."""
+        body: Dict[str, Any] = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": self._generation_config(max_output_tokens)
+        }
+        if cached_content:
+            cached_content_name = self._cached_content_names.get(cached_content)
+            if cached_content_name:
+                body["cachedContent"] = cached_content_name
+            else:
+                body["systemInstruction"] = {"parts": [{"text": self._prompt_prefixes[cached_content]}]}
+        return body
+    
+    @staticmethod
+    def _extract_text(data: Dict[str, Any]) -> str:
+        """Extract the generated text from a generateContent response payload."""
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts if not part.get("thought"))
+    
+    async def _request_text(self, body: Dict[str, Any]) -> str:
+        """Make a single generateContent call and return the generated text."""
+        response = await self._http.post(
+            f"{GEMINI_API_BASE_URL}/models/{self.model_name}:generateContent",
+            headers=self._headers,
+            json=body
+        )
+        response.raise_for_status()
+        return self._extract_text(response.json())
+    
+    async def _stream_text(self, body: Dict[str, Any], stop_when: Callable[[str], bool]) -> str:
+        """
+        Stream a generateContent call, closing the stream as soon as stop_when accepts the text.
+        
+        Generation time grows with output length, so stopping once the caller
+        has what it needs avoids waiting for the rest of the response.
+        """
+        text = ""
+        async with self._http.stream(
+            "POST",
+            f"{GEMINI_API_BASE_URL}/models/{self.model_name}:streamGenerateContent",
+            headers=self._headers,
+            params={"alt": "sse"},
+            json=body
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                text += self._extract_text(json.loads(line[len("data:"):]))
+                if stop_when(text):
+                    logger.debug("Gemini stream closed early")
+                    break
+        return text
+    
+    def _retry_policy(self, error: Exception) -> Optional[Tuple[str, int, int]]:
+        """
+        Classify a failed call and pick its retry policy.
+        
+        Returns:
+            Tuple of (policy name, maximum retries, base delay in ms), or None
+            if retrying cannot help (e.g. a bad request)
+        """
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in _RATE_LIMIT_STATUS_CODES:
+            return "rate_limit", self.rate_limit_max_retries, self.rate_limit_base_delay_ms
+        if _is_transient(error):
+            # max_retries counts the first attempt
+            return "transient", self.max_retries - 1, self.base_retry_delay_ms
+        if isinstance(error, ValueError):
+            # An empty or unparseable response: reprompt immediately
+            return "validation", self.validation_max_retries, 0
+        return None
+    
+    async def generate_response(
+        self,
+        prompt: str,
+        cached_content: Optional[str] = None,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        max_output_tokens: Optional[int] = None,
+        validate: Optional[Callable[[str], Any]] = None
+    ) -> str:
         """
         Generate a response from the Gemini API with retry logic.
         
-        Implements exponential backoff retry logic:
-        - Attempt 1: immediate
-        - Attempt 2: wait base_retry_delay_ms (1000ms = 1s)
-        - Attempt 3: wait base_retry_delay_ms * retry_multiplier (2000ms = 2s)
-        - Attempt 4: wait base_retry_delay_ms * retry_multiplier^2 (4000ms = 4s)
+        Identical prompts are served from an in-process LRU cache without
+        calling the API.
+        
+        Failures are retried according to their kind, each with its own budget:
+        - Rate limiting (429, 503): up to rate_limit_max_retries retries with
+          exponential backoff from rate_limit_base_delay_ms
+        - Other server and network errors: up to max_retries attempts in total
+          with exponential backoff from base_retry_delay_ms
+        - Empty responses, or responses rejected by validate: up to
+          validation_max_retries immediate reprompts
+        
+        Backoff uses full jitter so concurrent callers do not retry in lockstep:
+        retry n waits a random time up to base_delay * retry_multiplier^(n - 1).
+        Other errors (e.g. a bad request) are not retried.
         
         Args:
             prompt: The prompt to send to the API
-            
+            cached_content: Handle from register_prompt_prefix for the static prefix
+            stop_when: Predicate on the partial text; if given, the response is streamed
+                and generation stops as soon as it returns True
+            max_output_tokens: Cap on response tokens (excluding thinking), None for no cap
+            validate: Check of the response text that raises ValueError if it is unusable;
+                rejected responses are reprompted and never cached
+        
         Returns:
-            The generated response text
-            
+            The generated response text (possibly truncated by stop_when)
+        
         Raises:
-            Exception: If all retry attempts fail
+            Exception: If a non-retryable error occurs or the retry budget is exhausted
         """
+        cache_key = None
+        if self.response_cache_size > 0:
+            cache_key = self._cache_key(prompt, cached_content)
+            cached_text = self._cache_get(cache_key)
+            if cached_text is not None:
+                logger.debug("Gemini response served from cache")
+                return cached_text
+        
+        body = self._build_request_body(prompt, cached_content, max_output_tokens)
         last_exception: Optional[Exception] = None
+        retries: Dict[str, int] = {}
+        attempt = 0
         
-        for attempt in range(1, self.max_retries + 1):
+        while True:
+            attempt += 1
             try:
-                logger.debug(f"Gemini API call attempt {attempt}/{self.max_retries}")
+                logger.debug("Gemini API call attempt %d", attempt)
                 
                 # Make the API call
-                response = self.model.generate_content(prompt)
+                async with self._limiter:
+                    if stop_when is None:
+                        text = await self._request_text(body)
+                    else:
+                        text = await self._stream_text(body, stop_when)
                 
-                # Extract text from response
-                if response and response.text:
-                    logger.debug(f"Gemini API call succeeded on attempt {attempt}")
-                    return response.text
-                else:
+                if not text:
                     raise ValueError("Empty response from Gemini API")
-                    
+                if validate is not None:
+                    validate(text)
+                
+                logger.debug("Gemini API call succeeded on attempt %d", attempt)
+                if cache_key is not None:
+                    self._cache_put(cache_key, text)
+                return text
+            
             except Exception as e:
                 last_exception = e
-                logger.warning(
-                    f"Gemini API call failed on attempt {attempt}/{self.max_retries}: {str(e)}"
-                )
+                logger.warning(f"Gemini API call failed on attempt {attempt}: {str(e)}")
                 
-                # If this wasn't the last attempt, wait before retrying
-                if attempt < self.max_retries:
-                    # Calculate delay: base_delay * (multiplier ^ (attempt - 1))
-                    delay_ms = self.base_retry_delay_ms * (self.retry_multiplier ** (attempt - 1))
-                    delay_seconds = delay_ms / 1000.0
+                # Retrying cannot fix a bad request
+                policy = self._retry_policy(e)
+                if policy is None:
+                    break
+                name, max_retries, base_delay_ms = policy
+                retries[name] = retries.get(name, 0) + 1
+                if retries[name] > max_retries:
+                    break
+                
+                if base_delay_ms > 0:
+                    # Calculate delay: random in [0, base_delay * (multiplier ^ (retry - 1))]
+                    delay_ms = base_delay_ms * (self.retry_multiplier ** (retries[name] - 1))
+                    delay_seconds = random.uniform(0, delay_ms) / 1000.0
                     
-                    logger.info(f"Retrying in {delay_seconds}s...")
-                    time.sleep(delay_seconds)
+                    logger.info(f"Retrying after {name} failure in {delay_seconds:.2f}s...")
+                    await asyncio.sleep(delay_seconds)
+                else:
+                    logger.info(f"Retrying after {name} failure")
         
-        # All retries exhausted
-        error_msg = f"Gemini API call failed after {self.max_retries} attempts"
+        # Retry budget exhausted or error not retryable
+        error_msg = f"Gemini API call failed after {attempt} attempt(s)"
         logger.error(f"{error_msg}: {str(last_exception)}")
         raise Exception(f"{error_msg}: {str(last_exception)}")
@@ -1,15 +1,23 @@
 """Multi-Agent Validator for orchestrating answerer-validator consensus loop."""
 
+import asyncio
 import logging
-from typing import Optional
-from agents.answerer_agent import AnswererAgent
-from agents.validator_agent import ValidatorAgent
+from typing import List, Optional, Tuple
+from agents.answerer_agent import AnswererAgent, AnswererResponse
+from agents.validator_agent import ValidatorAgent, ValidatorResponse
 from models.schemas import QuestionItem
 
 
 logger = logging.getLogger(__name__)
 
 
+# Answer letters that can be validated speculatively (one validator call per option)
+_SPECULATIVE_LETTERS = "ABCDEFGH"
+
+# Reasoning passed to speculative validator calls issued before the answerer has replied
+_SPECULATIVE_REASONING = "Not provided. Evaluate the proposed answer on its own merits."
+
+
 class ValidationResult:
     """Result from the multi-agent validation process."""
     
@@ -34,7 +42,8 @@ class MultiAgentValidator:
         self,
         answerer_agent: AnswererAgent,
         validator_agent: ValidatorAgent,
-        max_iterations: int = 5
+        max_iterations: int = 5,
+        speculative_validation: bool = False
     ):
         """
         Initialize the Multi-Agent Validator.
@@ -43,13 +52,87 @@ class MultiAgentValidator:
             answerer_agent: The answerer agent instance
             validator_agent: The validator agent instance
             max_iterations: Maximum number of validation iterations (default: 5)
+            speculative_validation: Validate every option in parallel with the first answerer call (default: False)
         """
         self.answerer_agent = answerer_agent
         self.validator_agent = validator_agent
         self.max_iterations = max_iterations
+        self.speculative_validation = speculative_validation
         logger.info(f"MultiAgentValidator initialized with max_iterations={max_iterations}")
     
-    def validate_question(self, question: QuestionItem) -> ValidationResult:
+    @staticmethod
+    def prompt_size(question: QuestionItem) -> int:
+        """
+        Estimate the size a question adds to a batched prompt.
+        
+        Counts characters of the question, title and answers as a cheap proxy
+        for tokens.
+        
+        Args:
+            question: The question to measure
+            
+        Returns:
+            Approximate prompt size in characters
+        """
+        return len(question.content) + len(question.title) + sum(len(answer.content) for answer in question.answers)
+    
+    async def _answer_with_speculative_validation(
+        self,
+        question: QuestionItem
+    ) -> Tuple[AnswererResponse, Optional[ValidatorResponse]]:
+        """
+        Run the first answerer call alongside one validator call per answer option.
+        
+        Hides the validator round trip on the first iteration at the cost of
+        extra validator tokens. Once the answerer replies, only the verdict for
+        its letter is awaited and the other calls are cancelled. Only a
+        speculative AGREE is returned, since the answerer's reasoning could
+        still overturn a DISAGREE. A cached answer skips speculation.
+        
+        Args:
+            question: The question to validate
+            
+        Returns:
+            The answerer response and the matching speculative verdict (or None)
+            
+        Raises:
+            Exception: If the answerer call fails
+        """
+        cached = await self.answerer_agent.cached_answer(question)
+        if cached is not None:
+            return cached, None
+        
+        speculative = {
+            letter: asyncio.create_task(
+                self.validator_agent.validate_answer(
+                    question,
+                    letter,
+                    _SPECULATIVE_REASONING,
+                    use_cache=False
+                )
+            )
+            for letter in _SPECULATIVE_LETTERS[:len(question.answers)]
+        }
+        try:
+            answerer_response = await self.answerer_agent.answer_question(question)
+            task = speculative.get(answerer_response.selected_answer.strip().upper())
+            if task is None:
+                return answerer_response, None
+            try:
+                validator_response = await task
+            except Exception as e:
+                logger.debug("Question %s: Speculative validation failed: %s", question.questionNumber, e)
+                return answerer_response, None
+            if validator_response.agrees():
+                return answerer_response, validator_response
+            return answerer_response, None
+        finally:
+            # Drop the verdicts for letters the answerer did not pick
+            for task in speculative.values():
+                task.cancel()
+            await asyncio.gather(*speculative.values(), return_exceptions=True)
+    
+    async def validate_question(self, question: QuestionItem) -> ValidationResult:
         """
         Validate a question through the multi-agent consensus loop.
         
@@ -82,26 +165,40 @@ class MultiAgentValidator:
         while iteration < self.max_iterations:
             iteration += 1
             logger.debug(
-                f"Question {question.questionNumber}: Iteration {iteration}/{self.max_iterations}",
+                "Question %s: Iteration %d/%d",
+                question.questionNumber,
+                iteration,
+                self.max_iterations,
                 extra={'question_number': question.questionNumber}
             )
             
             # Step 1: Get answer from answerer agent
-            answerer_response = self.answerer_agent.answer_question(
-                question,
-                previous_answer=previous_answer,
-                criticism=criticism
-            )
+            validator_response: Optional[ValidatorResponse] = None
+            if (
+                iteration == 1
+                and self.speculative_validation
+                and len(question.answers) <= len(_SPECULATIVE_LETTERS)
+            ):
+                answerer_response, validator_response = await self._answer_with_speculative_validation(question)
+            else:
+                answerer_response = await self.answerer_agent.answer_question(
+                    question,
+                    previous_answer=previous_answer,
+                    criticism=criticism
+                )
             
             current_answer = answerer_response.selected_answer
             reasoning = answerer_response.reasoning
             
-            # Step 2: Get validation from validator agent
-            validator_response = self.validator_agent.validate_answer(
-                question,
-                current_answer,
-                reasoning
-            )
+            # Step 2: Get validation from validator agent (unless a speculative verdict applies)
+            # Reconsidered answers carry new reasoning, so only first-pass verdicts use the cache
+            if validator_response is None:
+                validator_response = await self.validator_agent.validate_answer(
+                    question,
+                    current_answer,
+                    reasoning,
+                    use_cache=(iteration == 1)
+                )
             
             # Step 3: Check for consensus
             if validator_response.agrees():
@@ -117,7 +214,9 @@ class MultiAgentValidator:
             
             # Step 4: Handle disagreement
             logger.debug(
-                f"Question {question.questionNumber}: Validator disagreed - {validator_response.criticism}",
+                "Question %s: Validator disagreed - %s",
+                question.questionNumber,
+                validator_response.criticism,
                 extra={'question_number': question.questionNumber}
             )
             
@@ -137,3 +236,53 @@ class MultiAgentValidator:
             iterations=iteration,
             consensus_reached=False
         )
+    
+    async def validate_questions_batch(self, questions: List[QuestionItem]) -> List[Optional[ValidationResult]]:
+        """
+        Run the first answerer-validator iteration for several questions at once.
+        
+        Both agents are called once for the whole batch, amortizing the prompt
+        preamble and round trips across questions. Only questions that reach
+        consensus in this pass get a result; the rest should be run through
+        validate_question individually.
+        
+        Args:
+            questions: The questions to validate
+            
+        Returns:
+            ValidationResult per question (in order), or None where no batch consensus was reached
+            
+        Raises:
+            Exception: If a batched agent call fails
+        """
+        logger.info(f"Starting batch validation for {len(questions)} questions")
+        
+        results: List[Optional[ValidationResult]] = [None] * len(questions)
+        
+        # Step 1: Get answers for the whole batch
+        answerer_responses = await self.answerer_agent.answer_questions_batch(questions)
+        answered = [i for i, response in enumerate(answerer_responses) if response is not None]
+        if not answered:
+            return results
+        
+        # Step 2: Validate all parsed answers in one call
+        validator_responses = await self.validator_agent.validate_answers_batch(
+            [questions[i] for i in answered],
+            [answerer_responses[i].selected_answer for i in answered],
+            [answerer_responses[i].reasoning for i in answered]
+        )
+        
+        # Step 3: Accept answers the validator agreed with
+        for i, validator_response in zip(answered, validator_responses):
+            if validator_response is not None and validator_response.agrees():
+                results[i] = ValidationResult(
+                    selected_answer=answerer_responses[i].selected_answer,
+                    iterations=1,
+                    consensus_reached=True
+                )
+        
+        logger.info(
+            f"Batch validation reached consensus for {sum(r is not None for r in results)} "
+            f"of {len(questions)} questions"
+        )
+        return results
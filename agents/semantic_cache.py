@@ -0,0 +1,165 @@
+"""Persistent question-level cache for agent responses."""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Any, Optional, Tuple
+from models.schemas import QuestionItem
+
+
+logger = logging.getLogger(__name__)
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Matches whitespace at the end of each line
+_TRAILING_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+$", re.MULTILINE)
+
+
+def canonical_text(text: str) -> str:
+    """
+    Canonicalize text placed in prompts and cache keys.
+    
+    Unicode is normalized to NFC and trailing whitespace is stripped from every
+    line, so equivalent inputs render byte-identical prompts and hash identically.
+    
+    Args:
+        text: The text to canonicalize
+    
+    Returns:
+        The canonical text
+    """
+    return _TRAILING_WHITESPACE_RE.sub("", _nfc(text)).rstrip()
+
+
+def _nfc(text: str) -> str:
+    """Normalize text to Unicode NFC, skipping the common all-ASCII case."""
+    return text if text.isascii() else unicodedata.normalize("NFC", text)
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace and case so trivially different texts compare equal."""
+    return _WHITESPACE_RE.sub(" ", _nfc(text).strip().lower())
+
+
+def question_cache_key(question: QuestionItem, *extra: str) -> str:
+    """
+    Build a normalized cache key for a question.
+    
+    Answer order is preserved because selected answers are positional letters.
+    The normalized fields are JSON-encoded before hashing, so no answer text
+    or extra value can collide with a different split of the same characters.
+    
+    Args:
+        question: The question to key
+        *extra: Additional values to include in the key (e.g. a selected answer)
+    
+    Returns:
+        Hex digest identifying the normalized question
+    """
+    parts = [
+        _normalize(question.content),
+        [_normalize(answer.content) for answer in question.answers],
+        list(extra)
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+
+
+def question_identity_key(question: QuestionItem) -> str:
+    """
+    Build an exact key identifying a question, for merging identical questions.
+    
+    Unlike question_cache_key, case and inner whitespace are kept, so only
+    questions whose content, title and ordered answers are the same after
+    canonical_text share a key.
+    
+    Args:
+        question: The question to key
+    
+    Returns:
+        Hex digest identifying the question
+    """
+    parts = [
+        canonical_text(question.content),
+        canonical_text(question.title),
+        [canonical_text(answer.content) for answer in question.answers]
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+
+
+class SemanticCache:
+    """
+    Small sqlite-backed store for agent responses keyed by normalized question.
+    
+    Methods block on sqlite, so async callers run them with asyncio.to_thread.
+    File-backed databases use WAL journaling so several server processes can
+    share one file with concurrent readers.
+    """
+    
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initialize the cache.
+        
+        Args:
+            path: Path to the sqlite database file (default: in-memory)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets readers proceed during writes; NORMAL sync skips the fsync on every commit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+        logger.info(f"SemanticCache initialized at {path}")
+    
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, ...]]:
+        """
+        Look up a cached value.
+        
+        Args:
+            namespace: Cache namespace (e.g. "answerer", "validator")
+            key: Key produced by question_cache_key
+        
+        Returns:
+            The cached tuple, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return tuple(json.loads(row[0]))
+    
+    def set(self, namespace: str, key: str, value: Tuple[Any, ...]) -> None:
+        """
+        Store a value in the cache.
+        
+        Args:
+            namespace: Cache namespace (e.g. "answerer", "validator")
+            key: Key produced by question_cache_key
+            value: Tuple of JSON-serializable values to store
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value) VALUES (?, ?, ?)",
+                (namespace, key, json.dumps(list(value)))
+            )
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
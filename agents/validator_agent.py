@@ -1,14 +1,105 @@
 """Validator Agent for critically reviewing answer selections."""
 
+import asyncio
+import functools
 import logging
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Tuple
 from agents.gemini_client import GeminiClient
+from agents.semantic_cache import SemanticCache, canonical_text, question_cache_key
 from models.schemas import QuestionItem
 
 
 logger = logging.getLogger(__name__)
 
 
+# Matches the "VERDICT:" and "CRITICISM:" lines of a response
+_FIELD_RE = re.compile(r"^[ \t]*(VERDICT|CRITICISM):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+# Matches an AGREE verdict line, which is all the consensus check needs from a response
+_AGREE_RE = re.compile(r"^[ \t]*VERDICT:[ \t]*(?i:AGREE)\b", re.MULTILINE)
+
+# Matches the numbered "VERDICT_N:" and "CRITICISM_N:" lines of a batched response
+_BATCH_FIELD_RE = re.compile(r"^[ \t]*(VERDICT|CRITICISM)_(\d+):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+# Static instructions shared by every validator request, registered as a cached prompt prefix
+VALIDATOR_SYSTEM_PROMPT = """You are a critical reviewer evaluating answer selections for multiple-choice questions.
+
+Each request contains the question content, the question title, the available answers as a lettered list,
+the proposed answer and the answerer's reasoning.
+
+Task: Critically evaluate whether the proposed answer is the best choice. Consider:
+- Does it accurately address the question?
+- Are there better options available?
+- Is the reasoning sound?
+
+Format your response as:
+VERDICT: [AGREE or DISAGREE]
+If you DISAGREE, also provide:
+CRITICISM: [specific issues and suggested alternative letter]
+"""
+
+# Static instructions for validating several numbered answer selections in one request
+VALIDATOR_BATCH_SYSTEM_PROMPT = """You are a critical reviewer evaluating answer selections for multiple-choice questions.
+
+Each request contains several questions, each introduced by a marker "Q<N>:" and followed by its content, title,
+available answers as a lettered list, the proposed answer and the answerer's reasoning.
+
+Task: For every question, critically evaluate whether the proposed answer is the best choice. Consider:
+- Does it accurately address the question?
+- Are there better options available?
+- Is the reasoning sound?
+
+Format your response with one line per question, where N is the question's number:
+VERDICT_N: [AGREE or DISAGREE]
+If you DISAGREE, also provide:
+CRITICISM_N: [specific issues and suggested alternative letter]
+"""
+
+# Output token cap for one verdict (plus criticism when disagreeing)
+_MAX_OUTPUT_TOKENS = 256
+
+# Letters used to label answer options (A, B, C, D, etc.)
+_LETTERS = "ABCDEFGH"
+
+# Per-question part of the prompt, up to the proposed answer
+_VALIDATOR_TEMPLATE = """Question Content:
+{content}
+
+Question Title:
+{title}
+
+Available Answers:
+{answer_list}
+
+Proposed Answer:
+{selected_answer}
+"""
+
+# Appended after the proposed answer
+_REASONING_TEMPLATE = """
+Answerer's Reasoning:
+{reasoning}
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_base_prompt(content: str, title: str, answers: Tuple[str, ...], selected_answer: str) -> str:
+    """
+    Render the question and proposed answer block of the prompt, reused across iterations.
+    
+    Keyed on the raw texts, so canonicalization only runs on a cache miss.
+    """
+    # Format answer options as lettered list (A, B, C, D, etc.)
+    answer_list = "\n".join(f"{_LETTERS[i]}. {canonical_text(answer)}" for i, answer in enumerate(answers))
+    return _VALIDATOR_TEMPLATE.format(
+        content=canonical_text(content),
+        title=canonical_text(title),
+        answer_list=answer_list,
+        selected_answer=selected_answer
+    )
+
+
 class ValidatorResponse:
     """Response from the Validator Agent."""
     
@@ -34,14 +125,18 @@ class ValidatorResponse:
 class ValidatorAgent:
     """Agent responsible for critically reviewing and validating answer selections."""
     
-    def __init__(self, gemini_client: GeminiClient):
+    def __init__(self, gemini_client: GeminiClient, cache: Optional[SemanticCache] = None):
         """
         Initialize the Validator Agent.
         
         Args:
             gemini_client: The Gemini API client to use for generating responses
+            cache: Optional question-level cache for verdicts
         """
         self.gemini_client = gemini_client
+        self.cache = cache
+        self.cached_content = gemini_client.register_prompt_prefix(VALIDATOR_SYSTEM_PROMPT)
+        self.batch_cached_content = gemini_client.register_prompt_prefix(VALIDATOR_BATCH_SYSTEM_PROMPT)
         logger.info("ValidatorAgent initialized")
     
     def _build_prompt(
@@ -51,7 +146,10 @@ class ValidatorAgent:
         reasoning: str
     ) -> str:
         """
-        Build the prompt for the validator agent.
+        Build the per-question part of the validator prompt.
+        
+        The static instructions live in VALIDATOR_SYSTEM_PROMPT. Question text is
+        canonicalized so repeated questions render byte-identical prompts.
         
         Args:
             question: The question being answered
@@ -61,42 +159,13 @@ class ValidatorAgent:
         Returns:
             The formatted prompt string
         """
-        # Format answer options as lettered list (A, B, C, D, etc.)
-        letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
-        answer_list = "\n".join([f"{letters[i]}. {answer.content}" for i, answer in enumerate(question.answers)])
-        
-        prompt = f"""You are a critical reviewer evaluating answer selections for multiple-choice questions.
-
-Question Content:
-{question.content}
-
-Question Title:
-{question.title}
-
-Available Answers:
-{answer_list}
-
-Proposed Answer:
-{selected_answer}
-
-Answerer's Reasoning:
-{reasoning}
-
-Task: Critically evaluate whether the proposed answer is the best choice. Consider:
-- Does it accurately address the question?
-- Are there better options available?
-- Is the reasoning sound?
-
-Format your response as:
-VERDICT: [AGREE or DISAGREE]
-"""
-        
-        # Add instruction for criticism if disagreeing
-        prompt += """If you DISAGREE, also provide:
-CRITICISM: [specific issues and suggested alternative letter]
-"""
-        
-        return prompt
+        base_prompt = _build_base_prompt(
+            question.content,
+            question.title,
+            tuple(answer.content for answer in question.answers),
+            selected_answer
+        )
+        return base_prompt + _REASONING_TEMPLATE.format(reasoning=reasoning)
     
     def _parse_response(self, response_text: str) -> ValidatorResponse:
         """
@@ -111,20 +180,11 @@ CRITICISM: [specific issues and suggested alternative letter]
         Raises:
             ValueError: If response cannot be parsed
         """
-        lines = response_text.strip().split('\n')
-        verdict = None
-        criticism = None
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith("VERDICT:"):
-                verdict_text = line[len("VERDICT:"):].strip().upper()
-                if verdict_text in ["AGREE", "DISAGREE"]:
-                    verdict = verdict_text
-            elif line.startswith("CRITICISM:"):
-                criticism = line[len("CRITICISM:"):].strip()
-        
-        if not verdict:
+        fields = {match.group(1): match.group(2) for match in _FIELD_RE.finditer(response_text)}
+        verdict = fields.get("VERDICT", "").upper()
+        criticism = fields.get("CRITICISM")
+        
+        if verdict not in ["AGREE", "DISAGREE"]:
             raise ValueError("Could not extract VERDICT from response")
         
         # If verdict is DISAGREE, criticism should be present
@@ -133,11 +193,36 @@ CRITICISM: [specific issues and suggested alternative letter]
         
         return ValidatorResponse(verdict=verdict, criticism=criticism)
     
-    def validate_answer(
+    def _parse_batch_response(self, response_text: str, count: int) -> List[Optional[ValidatorResponse]]:
+        """
+        Parse a batched response into one verdict per question.
+        
+        Args:
+            response_text: The raw response from the Gemini API
+            count: Number of questions in the batch
+            
+        Returns:
+            ValidatorResponse per question, or None where it could not be parsed
+        """
+        fields: Dict[Tuple[str, int], str] = {
+            (match.group(1), int(match.group(2))): match.group(3)
+            for match in _BATCH_FIELD_RE.finditer(response_text)
+        }
+        responses: List[Optional[ValidatorResponse]] = []
+        for n in range(1, count + 1):
+            verdict = fields.get(("VERDICT", n), "").upper()
+            if verdict in ["AGREE", "DISAGREE"]:
+                responses.append(ValidatorResponse(verdict=verdict, criticism=fields.get(("CRITICISM", n))))
+            else:
+                responses.append(None)
+        return responses
+    
+    async def validate_answer(
         self,
         question: QuestionItem,
         selected_answer: str,
-        reasoning: str
+        reasoning: str,
+        use_cache: bool = True
     ) -> ValidatorResponse:
         """
         Validate an answer selection.
@@ -146,6 +231,7 @@ CRITICISM: [specific issues and suggested alternative letter]
             question: The question being answered
             selected_answer: The answer selected by the answerer
             reasoning: The answerer's reasoning
+            use_cache: Whether to read and store the verdict in the question cache
             
         Returns:
             ValidatorResponse with verdict and optional criticism
@@ -155,13 +241,31 @@ CRITICISM: [specific issues and suggested alternative letter]
         """
         logger.info(f"Validating answer for question {question.questionNumber}")
         
+        # Serve verdicts for an already-reviewed (question, answer) pair from the cache
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = question_cache_key(question, selected_answer)
+            cached = await asyncio.to_thread(self.cache.get, "validator", cache_key)
+            if cached is not None:
+                logger.info(f"Question {question.questionNumber}: Using cached verdict {cached[0]}")
+                return ValidatorResponse(verdict=cached[0], criticism=cached[1])
+        
         # Build the prompt
         prompt = self._build_prompt(question, selected_answer, reasoning)
-        logger.debug(f"Validator prompt: {prompt}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Validator prompt: %s", prompt)
         
         # Get response from Gemini
-        response_text = self.gemini_client.generate_response(prompt)
-        logger.debug(f"Validator response: {response_text}")
+        # Stop generating once an AGREE verdict arrives; a DISAGREE streams on for its criticism
+        response_text = await self.gemini_client.generate_response(
+            prompt,
+            cached_content=self.cached_content,
+            stop_when=lambda text: _AGREE_RE.search(text) is not None,
+            max_output_tokens=_MAX_OUTPUT_TOKENS,
+            validate=self._parse_response
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Validator response: %s", response_text)
         
         # Parse the response
         try:
@@ -169,7 +273,55 @@ CRITICISM: [specific issues and suggested alternative letter]
             logger.info(
                 f"Question {question.questionNumber}: Validator {parsed_response.verdict}"
             )
+            if cache_key is not None:
+                await asyncio.to_thread(
+                    self.cache.set,
+                    "validator",
+                    cache_key,
+                    (parsed_response.verdict, parsed_response.criticism)
+                )
             return parsed_response
         except ValueError as e:
             logger.error(f"Failed to parse validator response: {e}")
             raise
+    
+    async def validate_answers_batch(
+        self,
+        questions: List[QuestionItem],
+        selected_answers: List[str],
+        reasonings: List[str]
+    ) -> List[Optional[ValidatorResponse]]:
+        """
+        Validate several answer selections with a single API call.
+        
+        Args:
+            questions: The questions being answered
+            selected_answers: The answer selected for each question
+            reasonings: The answerer's reasoning for each question
+            
+        Returns:
+            ValidatorResponse per question (in order), or None where the verdict could not be parsed
+            
+        Raises:
+            Exception: If the API call fails
+        """
+        logger.info(f"Validating batch of {len(questions)} answers")
+        
+        prompt = "\n".join(
+            f"Q{n}:\n{self._build_prompt(question, selected_answer, reasoning)}"
+            for n, (question, selected_answer, reasoning) in enumerate(
+                zip(questions, selected_answers, reasonings),
+                start=1
+            )
+        )
+        response_text = await self.gemini_client.generate_response(
+            prompt,
+            cached_content=self.batch_cached_content,
+            max_output_tokens=_MAX_OUTPUT_TOKENS * len(questions)
+        )
+        
+        responses = self._parse_batch_response(response_text, len(questions))
+        missing = sum(response is None for response in responses)
+        if missing:
+            logger.warning(f"Could not parse {missing} of {len(questions)} batched verdicts")
+        return responses
@@ -1,20 +1,26 @@
 """FastAPI server for AI QA Validator API."""
 
+import asyncio
 import logging
 import os
-import uuid
+import secrets
 from typing import List
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+import httpx
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from contextlib import asynccontextmanager, suppress
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from models.schemas import QuestionItem, AnswerResult, SystemConfig
+from models.schemas import QuestionItem, AnswerResultInternal, SystemConfig
+from workers.answer_cache import AnswerCache
 from workers.question_processor import QuestionProcessor
 from agents.multi_agent_validator import MultiAgentValidator
 from agents.answerer_agent import AnswererAgent
 from agents.validator_agent import ValidatorAgent
 from agents.gemini_client import GeminiClient
-from utils.logging_config import configure_logging, set_request_id
+from agents.semantic_cache import SemanticCache
+from utils.logging_config import configure_logging, get_request_id, set_request_id, shutdown_logging
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +29,61 @@ logger = logging.getLogger(__name__)
 # Global instances
 question_processor: QuestionProcessor = None
 system_config: SystemConfig = None
+semantic_cache: SemanticCache = None
+http_client: httpx.AsyncClient = None
+
+# Answer letter to option index
+_LETTER_IDX = {letter: i for i, letter in enumerate("ABCDEFGH")}
+
+# Reusable decoder validating request bodies straight into QuestionItem structs
+_questions_decoder = msgspec.json.Decoder(List[QuestionItem])
+
+
+async def _decode_questions(request: Request) -> List[QuestionItem]:
+    """
+    Decode and validate the request body as a list of questions.
+    
+    Raises:
+        HTTPException: 422 if the body is not a valid list of questions
+    """
+    try:
+        return _questions_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _questions_response(questions: List[QuestionItem]) -> Response:
+    """Encode questions as a JSON response with msgspec."""
+    return Response(content=msgspec.json.encode(questions), media_type="application/json")
+
+
+def _mark_selected_answer(question: QuestionItem, result: AnswerResultInternal) -> None:
+    """Set isRight on the answer option matching the result's selected letter."""
+    selected_letter = result.selectedAnswer
+    if selected_letter and selected_letter in _LETTER_IDX:
+        idx = _LETTER_IDX[selected_letter]
+        if 0 <= idx < len(question.answers):
+            question.answers[idx].isRight = True
+        else:
+            logger.warning(
+                "Selected answer index %d out of bounds for question %s", idx, question.questionNumber
+            )
+
+
+async def _refresh_cached_contents(gemini_client: GeminiClient) -> None:
+    """
+    Extend the agents' cached contents shortly before they expire.
+    
+    Stops once no prompt prefix is stored as cached content any more.
+    
+    Args:
+        gemini_client: The client whose cached contents to keep alive
+    """
+    interval_seconds = max(gemini_client.context_cache_ttl_seconds - 60, 60)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        if not await gemini_client.extend_cached_contents():
+            return
 
 
 @asynccontextmanager
@@ -33,17 +94,31 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     # Startup: Initialize system components
-    global question_processor, system_config
+    global question_processor, system_config, semantic_cache, http_client
     
     # Load configuration from environment
     try:
+        thinking_budget = os.getenv("GEMINI_THINKING_BUDGET", "128")
+        answer_cache_similarity = os.getenv("ANSWER_CACHE_SIMILARITY")
         system_config = SystemConfig(
             geminiApiKey=os.getenv("GEMINI_API_KEY", ""),
             apiPort=int(os.getenv("API_PORT", 8000)),
             maxConcurrentWorkers=int(os.getenv("MAX_CONCURRENT_WORKERS", 5)),
+            questionBatchSize=int(os.getenv("QUESTION_BATCH_SIZE", 1)),
+            questionBatchWaitMs=int(os.getenv("QUESTION_BATCH_WAIT_MS", 50)),
+            questionBatchMaxChars=int(os.getenv("QUESTION_BATCH_MAX_CHARS", 24000)),
             maxValidationIterations=int(os.getenv("MAX_VALIDATION_ITERATIONS", 5)),
             geminiMaxRetries=int(os.getenv("GEMINI_MAX_RETRIES", 3)),
             geminiBaseRetryDelayMs=int(os.getenv("GEMINI_BASE_RETRY_DELAY_MS", 1000)),
+            geminiRateLimitMaxRetries=int(os.getenv("GEMINI_RATE_LIMIT_MAX_RETRIES", 8)),
+            geminiRateLimitBaseDelayMs=int(os.getenv("GEMINI_RATE_LIMIT_BASE_DELAY_MS", 2000)),
+            geminiValidationMaxRetries=int(os.getenv("GEMINI_VALIDATION_MAX_RETRIES", 2)),
+            geminiThinkingBudget=int(thinking_budget) if thinking_budget else None,
+            geminiRequestsPerMinute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE") or 0) or None,
+            enableSpeculativeValidation=os.getenv("ENABLE_SPECULATIVE_VALIDATION", "false").lower() == "true",
+            semanticCachePath=os.getenv("SEMANTIC_CACHE_PATH") or None,
+            answerCacheSize=int(os.getenv("ANSWER_CACHE_SIZE", 10000)),
+            answerCacheSimilarity=float(answer_cache_similarity) if answer_cache_similarity else None,
             logLevel=os.getenv("LOG_LEVEL", "INFO")
         )
         
@@ -57,44 +132,99 @@ async def lifespan(app: FastAPI):
             logger.error("GEMINI_API_KEY environment variable is not set")
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
-        logger.info(f"Configuration loaded: port={system_config.apiPort}, "
-                   f"workers={system_config.maxConcurrentWorkers}, "
-                   f"max_iterations={system_config.maxValidationIterations}")
+        logger.info(
+            "Configuration loaded: port=%d, workers=%d, max_iterations=%d",
+            system_config.apiPort,
+            system_config.maxConcurrentWorkers,
+            system_config.maxValidationIterations
+        )
+        
+        # Shared HTTP/2 connection pool for Gemini calls, sized to the worker count
+        max_connections = system_config.maxConcurrentWorkers * 4
+        http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
         
         # Initialize Gemini client
         gemini_client = GeminiClient(
             api_key=system_config.geminiApiKey,
+            http_client=http_client,
             max_retries=system_config.geminiMaxRetries,
-            base_retry_delay_ms=system_config.geminiBaseRetryDelayMs
+            base_retry_delay_ms=system_config.geminiBaseRetryDelayMs,
+            rate_limit_max_retries=system_config.geminiRateLimitMaxRetries,
+            rate_limit_base_delay_ms=system_config.geminiRateLimitBaseDelayMs,
+            validation_max_retries=system_config.geminiValidationMaxRetries,
+            requests_per_minute=system_config.geminiRequestsPerMinute,
+            thinking_budget=system_config.geminiThinkingBudget
         )
         
+        # Initialize the optional question cache shared by both agents
+        if system_config.semanticCachePath:
+            semantic_cache = SemanticCache(system_config.semanticCachePath)
+        
         # Initialize agents
-        answerer_agent = AnswererAgent(gemini_client)
-        validator_agent = ValidatorAgent(gemini_client)
+        answerer_agent = AnswererAgent(gemini_client, cache=semantic_cache)
+        validator_agent = ValidatorAgent(gemini_client, cache=semantic_cache)
         
         # Initialize multi-agent validator
         multi_agent_validator = MultiAgentValidator(
             answerer_agent=answerer_agent,
             validator_agent=validator_agent,
-            max_iterations=system_config.maxValidationIterations
+            max_iterations=system_config.maxValidationIterations,
+            speculative_validation=system_config.enableSpeculativeValidation
         )
         
+        # Initialize the in-memory answer cache, semantic if a similarity threshold is set
+        answer_cache = None
+        if system_config.answerCacheSize > 0:
+            similarity = system_config.answerCacheSimilarity
+            answer_cache = AnswerCache(
+                max_entries=system_config.answerCacheSize,
+                embed=gemini_client.embed_text if similarity is not None else None,
+                similarity_threshold=similarity if similarity is not None else 1.0
+            )
+        
         # Initialize question processor
         question_processor = QuestionProcessor(
             validator=multi_agent_validator,
-            max_concurrent_workers=system_config.maxConcurrentWorkers
+            max_concurrent_workers=system_config.maxConcurrentWorkers,
+            batch_size=system_config.questionBatchSize,
+            batch_wait_ms=system_config.questionBatchWaitMs,
+            batch_max_chars=system_config.questionBatchMaxChars,
+            answer_cache=answer_cache
         )
+        question_processor.start()
+        
+        # Register the agents' static prompt prefixes with Gemini context caching
+        cache_refresh_task = None
+        if await gemini_client.create_cached_contents():
+            cache_refresh_task = asyncio.create_task(_refresh_cached_contents(gemini_client))
         
         logger.info("AI QA Validator API started successfully")
         
     except Exception as e:
-        logger.error(f"Failed to start API: {e}", exc_info=True)
+        logger.error("Failed to start API: %s", e, exc_info=True)
         raise
     
     yield
     
     # Shutdown
     logger.info("Shutting down AI QA Validator API...")
+    await question_processor.stop()
+    if cache_refresh_task is not None:
+        cache_refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await cache_refresh_task
+    await gemini_client.aclose()
+    await http_client.aclose()
+    if semantic_cache is not None:
+        semantic_cache.close()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -102,7 +232,8 @@ app = FastAPI(
     title="AI QA Validator API",
     description="Multi-agent AI system for validating question answers",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -111,14 +242,13 @@ async def add_request_id(request: Request, call_next):
     """
     Middleware to add request ID for tracing.
     """
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
+    request_id = secrets.token_hex(8)
     
-    # Set request ID in logging context
+    # Set request ID in logging context; downstream handlers and tasks inherit it
     set_request_id(request_id)
     
     # Log incoming request
-    logger.info(f"{request.method} {request.url.path}")
+    logger.debug("%s %s", request.method, request.url.path)
     
     response = await call_next(request)
     
@@ -126,21 +256,32 @@ async def add_request_id(request: Request, call_next):
     response.headers["X-Request-ID"] = request_id
     
     # Log response
-    logger.info(f"{request.method} {request.url.path} - Status: {response.status_code}")
+    logger.debug("%s %s - Status: %d", request.method, request.url.path, response.status_code)
     
     return response
 
 
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """
+    Render HTTP errors with orjson instead of FastAPI's default JSONResponse.
+    """
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=exc.headers
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
     Global exception handler for unhandled errors.
     """
-    request_id = getattr(request.state, "request_id", "unknown")
-    set_request_id(request_id)
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    request_id = get_request_id() or "unknown"
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -150,36 +291,34 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.post("/api/answer-questions", response_model=List[QuestionItem])
-async def answer_questions(
-    questions: List[QuestionItem],
-    request: Request
-) -> List[QuestionItem]:
+@app.post("/api/answer-questions")
+async def answer_questions(request: Request) -> Response:
     """
     Process a list of multiple-choice questions through multi-agent validation.
     
+    The request body is a JSON list of QuestionItem objects, decoded and
+    validated with msgspec.
+    
     Args:
-        questions: List of QuestionItem objects to process
-        request: FastAPI request object (for request ID)
+        request: FastAPI request object (for the body)
         
     Returns:
-        List of QuestionItem objects with the correct answer marked as isRight=True
+        JSON list of QuestionItem objects with the correct answer marked as isRight=True
         
     Raises:
-        HTTPException: 400 for invalid input, 503 for service unavailable
+        HTTPException: 422 for invalid input, 503 for service unavailable
     """
-    request_id = getattr(request.state, "request_id", "unknown")
-    set_request_id(request_id)
-    
-    logger.info(f"Received request to process {len(questions)} questions")
+    questions = await _decode_questions(request)
+    logger.info("Received request to process %d questions", len(questions))
     
     # Validate that we have questions
     if not questions:
         logger.warning("Empty question list received")
-        return []
+        return _questions_response([])
     
     # Log request details
-    logger.debug(f"Questions: {[q.questionNumber for q in questions]}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Questions: %s", [q.questionNumber for q in questions])
     
     try:
         # Check if question processor is initialized
@@ -193,47 +332,31 @@ async def answer_questions(
         # Process questions through the multi-agent validator
         results = await question_processor.process_questions(questions)
         
-        # Map results back to questions and update isRight field
-        updated_questions = []
-        letter_to_index = {letter: i for i, letter in enumerate(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H'])}
-        
-        # Create a map of results by question number for safer matching
-        results_map = {res.questionNumber: res for res in results}
+        # Mark the selected answers in place, in a single pass over the questions
+        all_cached = True
         
-        for question in questions:
-            result = results_map.get(question.questionNumber)
-            
-            if not result:
-                logger.error(f"No result found for question {question.questionNumber}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to process question {question.questionNumber}"
-                )
+        for i, question in enumerate(questions):
+            # process_questions returns one result per question, in input order
+            result = results[i]
+            assert result.questionNumber == question.questionNumber
             
             if result.error:
-                logger.error(f"Question {result.questionNumber} failed: {result.error}")
+                logger.error("Question %s failed: %s", question.questionNumber, result.error)
                 raise HTTPException(
                     status_code=500,
-                    detail=f"Question {result.questionNumber} failed: {result.error}"
+                    detail=f"Question {question.questionNumber} failed: {result.error}"
                 )
             
             # Update the correct answer
-            selected_letter = result.selectedAnswer
-            if selected_letter and selected_letter in letter_to_index:
-                idx = letter_to_index[selected_letter]
-                if 0 <= idx < len(question.answers):
-                    question.answers[idx].isRight = True
-                else:
-                    logger.warning(
-                        f"Selected answer index {idx} out of bounds for question {question.questionNumber}"
-                    )
-            
-            updated_questions.append(question)
+            _mark_selected_answer(question, result)
+            all_cached = all_cached and result.cached
         
         # Log response summary
-        logger.info(f"Completed processing {len(updated_questions)} questions successfully")
+        logger.info("Completed processing %d questions successfully", len(questions))
         
-        return updated_questions
+        response = _questions_response(questions)
+        response.headers["X-Cache"] = "HIT" if all_cached else "MISS"
+        return response
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -241,8 +364,9 @@ async def answer_questions(
         
     except Exception as e:
         logger.error(
-            f"Error processing questions: {e}",
-            exc_info=True
+            "Error processing questions: %s: %.200s",
+            type(e).__name__, e,
+            exc_info=logger.isEnabledFor(logging.DEBUG)
         )
         
         # Check if it's a Gemini API availability issue
@@ -259,6 +383,49 @@ async def answer_questions(
         )
 
 
+@app.post("/api/answer-questions/stream")
+async def answer_questions_stream(request: Request) -> StreamingResponse:
+    """
+    Process questions and stream each one back as soon as it is answered.
+    
+    The response is NDJSON in completion order rather than input order. Each
+    line is either a QuestionItem with the correct answer marked isRight=True,
+    or an object with questionNumber and error for a question that failed.
+    
+    Args:
+        request: FastAPI request object (for the body)
+        
+    Returns:
+        Streaming NDJSON response
+        
+    Raises:
+        HTTPException: 422 for invalid input, 503 for service unavailable
+    """
+    questions = await _decode_questions(request)
+    logger.info("Received request to stream %d questions", len(questions))
+    
+    if question_processor is None:
+        logger.error("Question processor not initialized")
+        raise HTTPException(
+            status_code=503,
+            detail="Service is not ready. Please try again later."
+        )
+    
+    async def lines():
+        async for i, result in question_processor.iter_results(questions):
+            question = questions[i]
+            if result.error:
+                logger.error("Question %s failed: %s", question.questionNumber, result.error)
+                yield msgspec.json.encode(
+                    {"questionNumber": question.questionNumber, "error": result.error}
+                ) + b"\n"
+            else:
+                _mark_selected_answer(question, result)
+                yield msgspec.json.encode(question) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @app.get("/health")
 async def health_check():
     """
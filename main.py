@@ -26,5 +26,10 @@ if __name__ == "__main__":
         "api.server:app",
         host="0.0.0.0",
         port=port,
+        # libuv event loop and C HTTP parser; uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        limit_concurrency=512,
+        workers=int(os.getenv("UVICORN_WORKERS", 1)),
         log_level=os.getenv("LOG_LEVEL", "info").lower()
     )
@@ -1,5 +1,5 @@
 """Data models and schemas for the AI QA Validator system."""
 
-from models.schemas import QuestionItem, AnswerResult, SystemConfig
+from models.schemas import QuestionItem, AnswerResult, AnswerResultInternal, SystemConfig
 
-__all__ = ["QuestionItem", "AnswerResult", "SystemConfig"]
+__all__ = ["QuestionItem", "AnswerResult", "AnswerResultInternal", "SystemConfig"]
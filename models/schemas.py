@@ -1,46 +1,61 @@
-"""Pydantic models for request/response validation."""
+"""Models for request/response validation and system configuration.
 
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+Question payloads on the API hot path are msgspec structs, which decode and
+encode JSON much faster than Pydantic models. Pydantic is kept for
+configuration and the public result models; results inside the question
+processor are plain slotted dataclasses.
+"""
 
+import msgspec
+from dataclasses import dataclass
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Annotated, List, Optional
 
-class AnswerOption(BaseModel):
+
+class AnswerOption(msgspec.Struct):
     """Model for a single answer option."""
     content: str
     isRight: bool = False
 
-class QuestionItem(BaseModel):
-    """Model for a multiple-choice question item."""
+class QuestionItem(msgspec.Struct, frozen=True, kw_only=True):
+    """
+    Model for a multiple-choice question item.
     
-    content: str = Field(..., min_length=1, description="Full question text with context")
-    title: str = Field(..., min_length=1, description="Brief question summary")
-    type: str = Field(..., description="Question type (e.g., 'option')")
-    column: Optional[str] = Field(None, description="Layout column type")
-    answers: List[AnswerOption] = Field(..., min_length=2, description="Array of possible answers")
-    questionNumber: str = Field(..., min_length=1, description="Unique identifier for question")
+    Frozen because questions are shared read-only across deduplicated and
+    batched processing; answer options stay mutable so isRight can be set.
+    """
     
-    @field_validator('answers')
-    @classmethod
-    def validate_answers(cls, v: List[AnswerOption]) -> List[AnswerOption]:
-        """Ensure all answer options are valid."""
-        if not v:
-            raise ValueError("Answer list cannot be empty")
-        if len(v) < 2:
-            raise ValueError("Must have at least 2 answer options")
-        for answer in v:
-            if not answer.content or not answer.content.strip():
-                raise ValueError("Answer content cannot be empty strings")
-        return v
+    content: Annotated[str, msgspec.Meta(min_length=1, description="Full question text with context")]
+    title: Annotated[str, msgspec.Meta(min_length=1, description="Brief question summary")]
+    type: Annotated[str, msgspec.Meta(description="Question type (e.g., 'option')")]
+    column: Annotated[Optional[str], msgspec.Meta(description="Layout column type")] = None
+    answers: Annotated[List[AnswerOption], msgspec.Meta(min_length=2, description="Array of possible answers")]
+    questionNumber: Annotated[str, msgspec.Meta(min_length=1, description="Unique identifier for question")]
+    
+    def __post_init__(self) -> None:
+        """Ensure the question content and all answer options are non-empty."""
+        if not self.content.strip():
+            raise ValueError("Question content cannot be empty")
+        if any(not answer.content.strip() for answer in self.answers):
+            raise ValueError("Answer content cannot be empty strings")
 
 
 class AnswerResult(BaseModel):
-    """Model for a question answer result."""
+    """
+    Model for a question answer result.
+    
+    The question processor uses AnswerResultInternal instead, so the schema
+    of this model is only built on first use.
+    """
+    
+    model_config = ConfigDict(defer_build=True)
     
     questionNumber: str = Field(..., description="Matches input question number")
     selectedAnswer: Optional[str] = Field(None, description="The selected answer letter (A, B, C, D, etc.)")
     error: Optional[str] = Field(None, description="Error message (if failed)")
     validationIterations: int = Field(..., ge=0, description="Number of agent iterations")
     processingTimeMs: int = Field(..., ge=0, description="Total processing time in milliseconds")
+    cached: bool = Field(False, description="Whether the result was served from the answer cache")
     
     @field_validator('selectedAnswer', 'error')
     @classmethod
@@ -50,20 +65,32 @@ class AnswerResult(BaseModel):
         return v
 
 
+@dataclass(slots=True)
+class AnswerResultInternal:
+    """Lightweight answer result used inside the question processor, without validation."""
+    
+    questionNumber: str
+    selectedAnswer: Optional[str] = None
+    error: Optional[str] = None
+    validationIterations: int = 0
+    processingTimeMs: int = 0
+    cached: bool = False
+
+
 class SimpleAnswerResult(BaseModel):
     """Simplified model for question answer result (API response)."""
     
     questionNumber: str = Field(..., description="Matches input question number")
     selectedAnswer: str = Field(..., description="The selected answer letter (A, B, C, D, etc.)")
     
-    class Config:
-        """Pydantic config."""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "questionNumber": "1",
                 "selectedAnswer": "B"
             }
         }
+    )
 
 
 class SystemConfig(BaseModel):
@@ -72,9 +99,21 @@ class SystemConfig(BaseModel):
     geminiApiKey: str = Field(..., min_length=1, description="Gemini API authentication key")
     apiPort: int = Field(default=8000, ge=1, le=65535, description="API server port")
     maxConcurrentWorkers: int = Field(default=5, ge=1, description="Maximum concurrent workers")
+    questionBatchSize: int = Field(default=1, ge=1, description="Questions per batched first-pass Gemini call (1 disables batching)")
+    questionBatchWaitMs: int = Field(default=50, ge=0, description="Time a worker waits for more questions to fill a batch")
+    questionBatchMaxChars: int = Field(default=24000, ge=1, description="Prompt size budget of a question batch in characters")
     maxValidationIterations: int = Field(default=5, ge=1, description="Maximum validation loop iterations")
     geminiMaxRetries: int = Field(default=3, ge=1, description="Maximum Gemini API retry attempts")
     geminiBaseRetryDelayMs: int = Field(default=1000, ge=0, description="Base retry delay in milliseconds")
+    geminiRateLimitMaxRetries: int = Field(default=8, ge=0, description="Maximum Gemini retries after rate limiting (429/503)")
+    geminiRateLimitBaseDelayMs: int = Field(default=2000, ge=0, description="Base rate limit retry delay in milliseconds")
+    geminiValidationMaxRetries: int = Field(default=2, ge=0, description="Maximum immediate reprompts after an unusable Gemini response")
+    geminiThinkingBudget: Optional[int] = Field(default=128, ge=128, le=32768, description="Thinking tokens per Gemini call; gemini-2.5-pro needs 128-32768 (model default if unset)")
+    geminiRequestsPerMinute: Optional[int] = Field(default=None, ge=1, description="Gemini API rate limit (unlimited if unset)")
+    enableSpeculativeValidation: bool = Field(default=False, description="Validate all options in parallel with the first answer")
+    semanticCachePath: Optional[str] = Field(default=None, description="Path to the sqlite question cache (disabled if unset)")
+    answerCacheSize: int = Field(default=10000, ge=0, description="Answer results cached in memory (0 disables the cache)")
+    answerCacheSimilarity: Optional[float] = Field(default=None, gt=0, le=1, description="Embedding similarity for semantic answer cache hits (exact matches only if unset)")
     logLevel: str = Field(default="INFO", description="Logging level")
     
     @field_validator('logLevel')
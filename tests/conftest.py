@@ -0,0 +1,24 @@
+"""Shared fixtures for the test suite."""
+
+from typing import Callable, Sequence
+import pytest
+from models.schemas import AnswerOption, QuestionItem
+
+
+@pytest.fixture
+def make_question() -> Callable[..., QuestionItem]:
+    """Return a factory building valid QuestionItem objects."""
+    def factory(
+        number: str,
+        content: str = "What is 2 + 2?",
+        answers: Sequence[str] = ("3", "4", "5"),
+        title: str = "Arithmetic"
+    ) -> QuestionItem:
+        return QuestionItem(
+            questionNumber=number,
+            content=content,
+            title=title,
+            type="option",
+            answers=[AnswerOption(content=answer) for answer in answers]
+        )
+    return factory
@@ -0,0 +1,92 @@
+"""Tests for the exact-match and semantic answer cache."""
+
+from typing import List
+import pytest
+from models.schemas import AnswerResultInternal
+from workers.answer_cache import AnswerCache
+
+
+def _result(number: str, answer: str = "B") -> AnswerResultInternal:
+    return AnswerResultInternal(questionNumber=number, selectedAnswer=answer, validationIterations=1, processingTimeMs=250)
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit(make_question):
+    cache = AnswerCache(max_entries=4)
+    question = make_question("1")
+
+    result, _ = await cache.get(question)
+    assert result is None
+
+    cache.put(question, _result("1"))
+    hit, _ = await cache.get(make_question("9"))
+
+    assert hit.questionNumber == "9"
+    assert hit.selectedAnswer == "B"
+    assert hit.cached
+    assert hit.processingTimeMs == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_exact_tier_only_matches_identical_questions(make_question):
+    cache = AnswerCache(max_entries=4)
+    cache.put(make_question("1", content="What is 2 + 2?", answers=("CO", "Co")), _result("1"))
+
+    same, _ = await cache.get(make_question("2", content="What is 2 + 2?  ", answers=("CO", "Co")))
+    recased, _ = await cache.get(make_question("3", content="what is 2 + 2?", answers=("CO", "Co")))
+    reordered, _ = await cache.get(make_question("4", content="What is 2 + 2?", answers=("Co", "CO")))
+
+    assert same is not None
+    assert recased is None
+    assert reordered is None
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(make_question):
+    cache = AnswerCache(max_entries=2)
+    first, second, third = (make_question(n, content=f"Question {n}") for n in ("1", "2", "3"))
+    cache.put(first, _result("1"))
+    cache.put(second, _result("2"))
+
+    # Touch the first entry so the second becomes the least recently used
+    assert (await cache.get(first))[0] is not None
+    cache.put(third, _result("3"))
+
+    assert (await cache.get(first))[0] is not None
+    assert (await cache.get(second))[0] is None
+    assert (await cache.get(third))[0] is not None
+
+
+@pytest.mark.asyncio
+async def test_semantic_hit_above_threshold(make_question):
+    async def embed(text: str) -> List[float]:
+        # Questions about capitals embed close together, everything else far away
+        return [1.0, 0.01 * len(text)] if "capital" in text else [0.0, 1.0]
+
+    cache = AnswerCache(max_entries=4, embed=embed, similarity_threshold=0.99)
+    original = make_question("1", content="What is the capital of France?")
+    _, embedding = await cache.get(original)
+    cache.put(original, _result("1", answer="A"), embedding)
+
+    similar, _ = await cache.get(make_question("2", content="Which city is the capital of France?"))
+    unrelated, _ = await cache.get(make_question("3", content="What is 2 + 2?"))
+
+    assert similar.selectedAnswer == "A"
+    assert similar.questionNumber == "2"
+    assert unrelated is None
+
+
+@pytest.mark.asyncio
+async def test_embedding_failure_falls_back_to_exact_match(make_question):
+    async def embed(text: str) -> List[float]:
+        raise RuntimeError("embedding service down")
+
+    cache = AnswerCache(max_entries=4, embed=embed)
+    question = make_question("1")
+    result, embedding = await cache.get(question)
+    cache.put(question, _result("1"), embedding)
+
+    assert result is None
+    assert embedding is None
+    assert (await cache.get(question))[0] is not None
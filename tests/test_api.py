@@ -0,0 +1,114 @@
+"""Tests for the question answering endpoints and their request contract."""
+
+from typing import List
+import httpx
+import pytest
+import pytest_asyncio
+from agents.multi_agent_validator import ValidationResult
+from api import server
+from models.schemas import QuestionItem
+from workers.question_processor import QuestionProcessor
+
+
+class FixedAnswerValidator:
+    """Validator that always selects option B."""
+
+    @staticmethod
+    def prompt_size(question: QuestionItem) -> int:
+        return len(question.content)
+
+    async def validate_question(self, question: QuestionItem) -> ValidationResult:
+        return ValidationResult(selected_answer="B", iterations=1, consensus_reached=True)
+
+    async def validate_questions_batch(self, questions: List[QuestionItem]) -> List[ValidationResult]:
+        return [await self.validate_question(question) for question in questions]
+
+
+def _question(number: str = "1", content: str = "What is 2 + 2?", answers=("3", "4")) -> dict:
+    return {
+        "questionNumber": number,
+        "content": content,
+        "title": "Arithmetic",
+        "type": "option",
+        "answers": [{"content": answer, "isRight": False} for answer in answers]
+    }
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    processor = QuestionProcessor(FixedAnswerValidator(), max_concurrent_workers=2)
+    monkeypatch.setattr(server, "question_processor", processor)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+    await processor.stop()
+
+
+@pytest.mark.asyncio
+async def test_valid_body_marks_selected_answer(client):
+    response = await client.post("/api/answer-questions", json=[_question("1"), _question("2", content="And 3 + 3?")])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json() == [
+        {
+            "content": "What is 2 + 2?",
+            "title": "Arithmetic",
+            "type": "option",
+            "column": None,
+            "answers": [{"content": "3", "isRight": False}, {"content": "4", "isRight": True}],
+            "questionNumber": "1"
+        },
+        {
+            "content": "And 3 + 3?",
+            "title": "Arithmetic",
+            "type": "option",
+            "column": None,
+            "answers": [{"content": "3", "isRight": False}, {"content": "4", "isRight": True}],
+            "questionNumber": "2"
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_empty_list_returns_empty_list(client):
+    response = await client.post("/api/answer-questions", json=[])
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_blank_content_is_rejected(client):
+    response = await client.post("/api/answer-questions", json=[_question(content="   ")])
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Question content cannot be empty - at `$[0]`"}
+
+
+@pytest.mark.asyncio
+async def test_blank_answer_option_is_rejected(client):
+    response = await client.post("/api/answer-questions", json=[_question(answers=("3", " "))])
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Answer content cannot be empty strings - at `$[0]`"}
+
+
+@pytest.mark.asyncio
+async def test_single_option_is_rejected(client):
+    response = await client.post("/api/answer-questions", json=[_question(answers=("4",))])
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert isinstance(detail, str)
+    assert "length >= 2" in detail and "$[0].answers" in detail
+
+
+@pytest.mark.asyncio
+async def test_non_array_body_is_rejected(client):
+    response = await client.post("/api/answer-questions", json=_question())
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Expected `array`, got `object`"}
+
@@ -0,0 +1,58 @@
+"""Tests for parsing numbered fields out of batched agent responses."""
+
+import httpx
+import pytest
+from agents.answerer_agent import AnswererAgent
+from agents.gemini_client import GeminiClient
+from agents.validator_agent import ValidatorAgent
+
+
+@pytest.fixture
+def gemini_client() -> GeminiClient:
+    # The parsers never call the API
+    return GeminiClient(api_key="test-key", http_client=httpx.AsyncClient())
+
+
+def test_answerer_batch_keeps_parsed_answers_and_marks_garbled_ones(gemini_client):
+    response_text = (
+        "SELECTED_1: B\n"
+        "REASONING_1: Two plus two is four.\n"
+        "SELECTED_2: C\n"
+        "The reasoning for question 2 got lost.\n"
+        "  SELECTED_3:   A  \n"
+        "REASONING_3: Rome was the capital.\n"
+        "SELECTED_5: D\n"
+        "REASONING_5: Not part of this batch.\n"
+    )
+
+    responses = AnswererAgent(gemini_client)._parse_batch_response(response_text, 4)
+
+    assert len(responses) == 4
+    assert (responses[0].selected_answer, responses[0].reasoning) == ("B", "Two plus two is four.")
+    assert responses[1] is None
+    assert (responses[2].selected_answer, responses[2].reasoning) == ("A", "Rome was the capital.")
+    assert responses[3] is None
+
+
+def test_answerer_batch_with_no_numbered_fields(gemini_client):
+    responses = AnswererAgent(gemini_client)._parse_batch_response("SELECTED: B\nREASONING: Unnumbered.\n", 2)
+
+    assert responses == [None, None]
+
+
+def test_validator_batch_keeps_parsed_verdicts_and_marks_garbled_ones(gemini_client):
+    response_text = (
+        "VERDICT_1: agree\n"
+        "VERDICT_2: DISAGREE\n"
+        "CRITICISM_2: Option A is correct.\n"
+        "VERDICT_3: MAYBE\n"
+        "CRITICISM_4: A criticism without a verdict.\n"
+    )
+
+    responses = ValidatorAgent(gemini_client)._parse_batch_response(response_text, 4)
+
+    assert len(responses) == 4
+    assert responses[0].agrees()
+    assert (responses[1].verdict, responses[1].criticism) == ("DISAGREE", "Option A is correct.")
+    assert responses[2] is None
+    assert responses[3] is None
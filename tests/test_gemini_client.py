@@ -0,0 +1,116 @@
+"""Tests for the Gemini client's request building and retry policies."""
+
+from typing import List, Tuple
+import httpx
+import pytest
+from agents.gemini_client import GeminiClient
+
+
+def _ok(text: str = "SELECTED: B") -> httpx.Response:
+    return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def _client(responses: List[httpx.Response], **kwargs) -> Tuple[GeminiClient, List[httpx.Response]]:
+    """Build a client whose API calls return the given responses in order, and the responses not yet used."""
+    pending = list(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return pending.pop(0)
+
+    settings = dict(
+        max_retries=3,
+        base_retry_delay_ms=0,
+        rate_limit_max_retries=2,
+        rate_limit_base_delay_ms=0,
+        validation_max_retries=2,
+        response_cache_size=0
+    )
+    settings.update(kwargs)
+    client = GeminiClient(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        **settings
+    )
+    return client, pending
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_use_max_retries_as_total_attempts():
+    client, remaining = _client([httpx.Response(500)] * 3 + [_ok()])
+
+    with pytest.raises(Exception, match="after 3 attempt"):
+        await client.generate_response("prompt")
+    assert len(remaining) == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_error_recovers_within_budget():
+    client, _ = _client([httpx.Response(500), httpx.Response(504), _ok("done")])
+
+    assert await client.generate_response("prompt") == "done"
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_have_their_own_budget():
+    client, remaining = _client([httpx.Response(429)] * 3 + [_ok()])
+
+    with pytest.raises(Exception, match="after 3 attempt"):
+        await client.generate_response("prompt")
+    assert len(remaining) == 1
+
+
+@pytest.mark.asyncio
+async def test_budgets_are_counted_per_policy():
+    # Two server errors and two rate limits stay within their separate budgets
+    client, _ = _client(
+        [httpx.Response(500), httpx.Response(429), httpx.Response(503), httpx.Response(500), _ok("done")]
+    )
+
+    assert await client.generate_response("prompt") == "done"
+
+
+@pytest.mark.asyncio
+async def test_rejected_responses_are_reprompted():
+    def validate(text: str) -> None:
+        if "SELECTED" not in text:
+            raise ValueError("missing SELECTED line")
+
+    client, _ = _client([_ok(""), _ok("garbled"), _ok("SELECTED: C")])
+
+    assert await client.generate_response("prompt", validate=validate) == "SELECTED: C"
+
+
+@pytest.mark.asyncio
+async def test_validation_budget_exhausted():
+    client, remaining = _client([_ok("")] * 4)
+
+    with pytest.raises(Exception, match="after 3 attempt"):
+        await client.generate_response("prompt")
+    assert len(remaining) == 1
+
+
+@pytest.mark.asyncio
+async def test_bad_request_is_not_retried():
+    client, remaining = _client([httpx.Response(400), _ok()])
+
+    with pytest.raises(Exception, match="after 1 attempt"):
+        await client.generate_response("prompt")
+    assert len(remaining) == 1
+
+
+def test_output_cap_includes_thinking_budget():
+    client, _ = _client([], thinking_budget=128)
+
+    config = client._generation_config(256)
+
+    assert config["maxOutputTokens"] == 384
+    assert config["thinkingConfig"] == {"thinkingBudget": 128}
+
+
+def test_model_default_thinking_sends_no_output_cap():
+    client, _ = _client([], thinking_budget=None)
+
+    config = client._generation_config(256)
+
+    assert "maxOutputTokens" not in config
+    assert "thinkingConfig" not in config
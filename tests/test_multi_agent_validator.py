@@ -0,0 +1,106 @@
+"""Tests for the answerer-validator consensus loop."""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+import pytest
+from agents.answerer_agent import AnswererResponse
+from agents.multi_agent_validator import MultiAgentValidator
+from agents.validator_agent import ValidatorResponse
+from models.schemas import QuestionItem
+
+
+class FakeAnswerer:
+    """Answerer that always picks the same letter, optionally from its cache."""
+
+    def __init__(self, letter: str = "B", cached: bool = False):
+        self.letter = letter
+        self.cached = cached
+        self.calls = 0
+
+    async def cached_answer(self, question: QuestionItem) -> Optional[AnswererResponse]:
+        return AnswererResponse(self.letter, "cached reasoning") if self.cached else None
+
+    async def answer_question(self, question, previous_answer=None, criticism=None) -> AnswererResponse:
+        self.calls += 1
+        # Give speculative validator calls a chance to start first
+        await asyncio.sleep(0)
+        return AnswererResponse(self.letter, "fresh reasoning")
+
+
+class FakeValidatorAgent:
+    """Validator returning fixed verdicts per letter; letters without one never respond."""
+
+    def __init__(self, verdicts: Dict[str, str]):
+        self.verdicts = verdicts
+        self.calls: List[Tuple[str, bool]] = []
+        self.cancelled: List[str] = []
+
+    async def validate_answer(self, question, selected_answer, reasoning, use_cache=True) -> ValidatorResponse:
+        self.calls.append((selected_answer, use_cache))
+        if selected_answer not in self.verdicts:
+            try:
+                # Stands in for a call stuck in rate limit backoff
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled.append(selected_answer)
+                raise
+        verdict = self.verdicts[selected_answer]
+        return ValidatorResponse(verdict, None if verdict == "AGREE" else "Wrong")
+
+
+@pytest.mark.asyncio
+async def test_speculation_awaits_only_the_chosen_letter(make_question):
+    answerer = FakeAnswerer(letter="B")
+    validator = FakeValidatorAgent({"B": "AGREE"})
+    multi = MultiAgentValidator(answerer, validator, speculative_validation=True)
+
+    result = await asyncio.wait_for(multi.validate_question(make_question("1")), timeout=1)
+
+    assert (result.selected_answer, result.iterations, result.consensus_reached) == ("B", 1, True)
+    assert sorted(validator.cancelled) == ["A", "C"]
+    assert len(validator.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_speculative_disagree_is_revalidated_with_reasoning(make_question):
+    answerer = FakeAnswerer(letter="B")
+
+    class Reviewer(FakeValidatorAgent):
+        async def validate_answer(self, question, selected_answer, reasoning, use_cache=True):
+            if reasoning == "fresh reasoning":
+                self.calls.append((selected_answer, use_cache))
+                return ValidatorResponse("AGREE")
+            return await super().validate_answer(question, selected_answer, reasoning, use_cache)
+
+    validator = Reviewer({"A": "DISAGREE", "B": "DISAGREE", "C": "DISAGREE"})
+    multi = MultiAgentValidator(answerer, validator, speculative_validation=True)
+
+    result = await multi.validate_question(make_question("1"))
+
+    assert result.consensus_reached
+    assert validator.calls[-1] == ("B", True)
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_skips_speculation(make_question):
+    answerer = FakeAnswerer(letter="A", cached=True)
+    validator = FakeValidatorAgent({"A": "AGREE"})
+    multi = MultiAgentValidator(answerer, validator, speculative_validation=True)
+
+    result = await multi.validate_question(make_question("1"))
+
+    assert result.selected_answer == "A"
+    assert answerer.calls == 0
+    assert validator.calls == [("A", True)]
+
+
+@pytest.mark.asyncio
+async def test_validator_cache_only_used_on_first_iteration(make_question):
+    answerer = FakeAnswerer(letter="A")
+    validator = FakeValidatorAgent({"A": "DISAGREE"})
+    multi = MultiAgentValidator(answerer, validator, max_iterations=3)
+
+    result = await multi.validate_question(make_question("1"))
+
+    assert not result.consensus_reached
+    assert validator.calls == [("A", True), ("A", False), ("A", False)]
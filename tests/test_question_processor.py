@@ -0,0 +1,250 @@
+"""Tests for the question processor worker pool."""
+
+import asyncio
+from typing import Collection, Dict, List, Optional
+import pytest
+from agents.multi_agent_validator import ValidationResult
+from models.schemas import QuestionItem
+from workers.answer_cache import AnswerCache
+from workers.question_processor import QuestionProcessor
+
+
+class FakeValidator:
+    """Stand-in for MultiAgentValidator that records calls instead of calling Gemini."""
+
+    def __init__(
+        self,
+        delays: Optional[Dict[str, float]] = None,
+        fail: Collection[str] = (),
+        batch_consensus: Collection[str] = (),
+        gate: Optional[asyncio.Event] = None,
+        batch_gate: Optional[asyncio.Event] = None
+    ):
+        self.delays = delays or {}
+        self.fail = fail
+        self.batch_consensus = batch_consensus
+        self.gate = gate
+        self.batch_gate = batch_gate
+        self.calls: List[str] = []
+        self.batch_calls: List[List[str]] = []
+
+    @staticmethod
+    def prompt_size(question: QuestionItem) -> int:
+        return len(question.content)
+
+    @staticmethod
+    def answer_for(question: QuestionItem) -> str:
+        """Pick a letter that depends on the question content."""
+        return "ABC"[len(question.content) % 3]
+
+    async def validate_question(self, question: QuestionItem) -> ValidationResult:
+        self.calls.append(question.questionNumber)
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(self.delays.get(question.questionNumber, 0))
+        if question.questionNumber in self.fail:
+            raise RuntimeError(f"validator failed on {question.questionNumber}")
+        return ValidationResult(selected_answer=self.answer_for(question), iterations=2, consensus_reached=True)
+
+    async def validate_questions_batch(self, questions: List[QuestionItem]) -> List[Optional[ValidationResult]]:
+        self.batch_calls.append([question.questionNumber for question in questions])
+        if self.batch_gate is not None:
+            await self.batch_gate.wait()
+        return [
+            ValidationResult(selected_answer=self.answer_for(question), iterations=1, consensus_reached=True)
+            if question.questionNumber in self.batch_consensus else None
+            for question in questions
+        ]
+
+
+async def _wait_until(condition, timeout: float = 1.0) -> None:
+    """Yield to the event loop until condition() holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_results_keep_input_order(make_question):
+    validator = FakeValidator(delays={"1": 0.03, "2": 0.01, "3": 0})
+    processor = QuestionProcessor(validator, max_concurrent_workers=3)
+    questions = [make_question(str(n), content=f"Question {'?' * n}") for n in (1, 2, 3)]
+
+    results = await processor.process_questions(questions)
+    await processor.stop()
+
+    assert [result.questionNumber for result in results] == ["1", "2", "3"]
+    assert [result.selectedAnswer for result in results] == [validator.answer_for(q) for q in questions]
+    assert all(result.error is None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_questions_validated_once(make_question):
+    validator = FakeValidator()
+    processor = QuestionProcessor(validator, max_concurrent_workers=2)
+    questions = [
+        make_question("1", content="Which is largest?"),
+        make_question("2", content="Which is smallest?"),
+        make_question("3", content="Which is largest?  ")
+    ]
+
+    results = await processor.process_questions(questions)
+    await processor.stop()
+
+    assert sorted(validator.calls) == ["1", "2"]
+    assert [result.questionNumber for result in results] == ["1", "2", "3"]
+    assert results[2].selectedAnswer == results[0].selectedAnswer
+
+
+@pytest.mark.asyncio
+async def test_questions_differing_in_case_are_not_merged(make_question):
+    class LetterOfUpperCase(FakeValidator):
+        @staticmethod
+        def answer_for(question: QuestionItem) -> str:
+            return "AB"[[answer.content for answer in question.answers].index("CO")]
+
+    validator = LetterOfUpperCase()
+    processor = QuestionProcessor(validator, max_concurrent_workers=2)
+    questions = [make_question("1", answers=("CO", "Co")), make_question("2", answers=("Co", "CO"))]
+
+    results = await processor.process_questions(questions)
+    await processor.stop()
+
+    assert sorted(validator.calls) == ["1", "2"]
+    assert [result.selectedAnswer for result in results] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_iter_results_yields_every_question(make_question):
+    validator = FakeValidator(delays={"1": 0.02})
+    processor = QuestionProcessor(validator, max_concurrent_workers=2)
+    questions = [make_question("1", content="Slow"), make_question("2", content="Fast")]
+
+    items = [item async for item in processor.iter_results(questions)]
+    await processor.stop()
+
+    assert [i for i, _ in items] == [1, 0]
+    assert [result.questionNumber for _, result in items] == ["2", "1"]
+
+
+@pytest.mark.asyncio
+async def test_batch_falls_back_for_questions_without_consensus(make_question):
+    validator = FakeValidator(batch_consensus={"1"})
+    processor = QuestionProcessor(validator, max_concurrent_workers=1, batch_size=4)
+    questions = [make_question("1", content="First"), make_question("2", content="Second")]
+
+    results = await processor.process_questions(questions)
+    await processor.stop()
+
+    assert validator.batch_calls == [["1", "2"]]
+    assert validator.calls == ["2"]
+    assert [result.validationIterations for result in results] == [1, 2]
+    assert all(result.error is None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_question_over_batch_budget_goes_to_idle_worker(make_question):
+    gate = asyncio.Event()
+    validator = FakeValidator(gate=gate)
+    processor = QuestionProcessor(validator, max_concurrent_workers=2, batch_size=4, batch_max_chars=20)
+    questions = [make_question("1", content="Short"), make_question("2", content="x" * 50)]
+
+    task = asyncio.create_task(processor.process_questions(questions))
+    # The oversized question starts on the second worker while the first is still busy
+    await _wait_until(lambda: sorted(validator.calls) == ["1", "2"])
+    gate.set()
+    results = await task
+    await processor.stop()
+
+    assert all(result.error is None for result in results)
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_validator_exception(make_question):
+    validator = FakeValidator(fail={"1"})
+    processor = QuestionProcessor(validator, max_concurrent_workers=1)
+    questions = [make_question("1", content="Broken"), make_question("2", content="Fine")]
+
+    results = await processor.process_questions(questions)
+    await processor.stop()
+
+    assert "validator failed on 1" in results[0].error
+    assert results[0].selectedAnswer is None
+    assert results[1].error is None
+    assert results[1].selectedAnswer == validator.answer_for(questions[1])
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_batch_collection_failure(make_question):
+    class FlakyValidator(FakeValidator):
+        """Fails the first prompt size estimate, outside the per-question error handling."""
+
+        failed = False
+
+        def prompt_size(self, question: QuestionItem) -> int:
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("prompt size unavailable")
+            return super().prompt_size(question)
+
+    validator = FlakyValidator(batch_consensus={"1", "2"})
+    processor = QuestionProcessor(validator, max_concurrent_workers=1, batch_size=2)
+
+    first = await processor.process_questions([make_question("1", content="First")])
+    second = await processor.process_questions([make_question("2", content="Second")])
+    await processor.stop()
+
+    assert "prompt size unavailable" in first[0].error
+    assert second[0].error is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_skips_queued_questions(make_question):
+    gate = asyncio.Event()
+    validator = FakeValidator(gate=gate)
+    processor = QuestionProcessor(validator, max_concurrent_workers=1)
+    questions = [make_question("1", content="First"), make_question("2", content="Second")]
+
+    task = asyncio.create_task(processor.process_questions(questions))
+    await _wait_until(lambda: validator.calls == ["1"])
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    gate.set()
+    await asyncio.sleep(0.01)
+    await processor.stop()
+
+    assert validator.calls == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_and_queued_futures(make_question):
+    validator = FakeValidator(gate=asyncio.Event())
+    processor = QuestionProcessor(validator, max_concurrent_workers=1)
+    processor.start()
+    running = processor._submit(make_question("1", content="First"))
+    queued = processor._submit(make_question("2", content="Second"))
+    await _wait_until(lambda: validator.calls == ["1"])
+
+    await processor.stop()
+
+    assert running.cancelled()
+    assert queued.cancelled()
+    assert processor._queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_answer_cache_serves_repeated_questions(make_question):
+    validator = FakeValidator()
+    processor = QuestionProcessor(validator, max_concurrent_workers=2, answer_cache=AnswerCache(max_entries=10))
+
+    first = await processor.process_questions([make_question("1", content="Cached")])
+    second = await processor.process_questions([make_question("7", content="Cached")])
+    await processor.stop()
+
+    assert validator.calls == ["1"]
+    assert not first[0].cached
+    assert second[0].cached
+    assert second[0].questionNumber == "7"
+    assert second[0].selectedAnswer == first[0].selectedAnswer
@@ -0,0 +1,45 @@
+"""Tests for the persistent question cache and its keys."""
+
+from agents.semantic_cache import SemanticCache, question_cache_key, question_identity_key
+
+
+def test_key_normalizes_whitespace_and_case(make_question):
+    assert question_cache_key(make_question("1", content="What is 2 + 2?")) == question_cache_key(
+        make_question("2", content="  what IS 2 +  2? ")
+    )
+
+
+def test_key_keeps_answer_order(make_question):
+    assert question_cache_key(make_question("1", answers=("3", "4"))) != question_cache_key(
+        make_question("1", answers=("4", "3"))
+    )
+
+
+def test_key_separators_cannot_collide(make_question):
+    assert question_cache_key(make_question("1", answers=("a|b", "c"))) != question_cache_key(
+        make_question("1", answers=("a", "b|c"))
+    )
+    assert question_cache_key(make_question("1", answers=("a", "b")), "c") != question_cache_key(
+        make_question("1", answers=("a", "b", "c"))
+    )
+
+
+def test_identity_key_is_exact(make_question):
+    assert question_identity_key(make_question("1", content="Which?\t\n")) == question_identity_key(
+        make_question("2", content="Which?")
+    )
+    assert question_identity_key(make_question("1", answers=("CO", "Co"))) != question_identity_key(
+        make_question("1", answers=("Co", "CO"))
+    )
+    assert question_identity_key(make_question("1", title="One")) != question_identity_key(
+        make_question("1", title="Two")
+    )
+
+
+def test_set_then_get_round_trips(tmp_path):
+    cache = SemanticCache(str(tmp_path / "cache.db"))
+    cache.set("validator", "key", ("AGREE", None))
+
+    assert cache.get("validator", "key") == ("AGREE", None)
+    assert cache.get("answerer", "key") is None
+    cache.close()
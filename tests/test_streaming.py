@@ -0,0 +1,78 @@
+"""Tests for streamed Gemini responses and the agents' early-stop rules."""
+
+import json
+from typing import AsyncIterator, List
+import httpx
+import pytest
+from agents.answerer_agent import AnswererAgent, _has_complete_answer
+from agents.gemini_client import GeminiClient
+from agents.validator_agent import ValidatorAgent
+
+
+class SSEStream:
+    """Serves text chunks as server-sent events and records how many were read."""
+
+    def __init__(self, chunks: List[str]):
+        self.chunks = chunks
+        self.sent = 0
+        self.paths: List[str] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=self._events())
+
+    async def _events(self) -> AsyncIterator[bytes]:
+        for chunk in self.chunks:
+            self.sent += 1
+            payload = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+            yield f"data: {json.dumps(payload)}\n\n".encode()
+
+
+def _client(stream: SSEStream) -> GeminiClient:
+    return GeminiClient(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(stream.handler)),
+        response_cache_size=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_validator_stream_stops_on_agree(make_question):
+    stream = SSEStream(["VERDICT: ", "AGREE\n", "CRITICISM: none\n", "Extra padding that is never needed\n"])
+    validator = ValidatorAgent(_client(stream))
+
+    response = await validator.validate_answer(make_question("1"), "B", "Four is correct")
+
+    assert response.agrees()
+    assert stream.sent == 2
+    assert stream.paths[0].endswith(":streamGenerateContent")
+
+
+@pytest.mark.asyncio
+async def test_validator_disagree_streams_through_criticism(make_question):
+    stream = SSEStream(["VERDICT: DISAGREE\n", "CRITICISM: Option C", " is correct.\n"])
+    validator = ValidatorAgent(_client(stream))
+
+    response = await validator.validate_answer(make_question("1"), "A", "Three is correct")
+
+    assert response.verdict == "DISAGREE"
+    assert response.criticism == "Option C is correct."
+    assert stream.sent == 3
+
+
+@pytest.mark.asyncio
+async def test_answerer_waits_for_complete_reasoning_line(make_question):
+    stream = SSEStream(["SELECTED: B\n", "REASONING: Two plus", " two is four.\n", "Trailing commentary\n"])
+    answerer = AnswererAgent(_client(stream))
+
+    response = await answerer.answer_question(make_question("1"))
+
+    assert response.selected_answer == "B"
+    assert response.reasoning == "Two plus two is four."
+    assert stream.sent == 3
+
+
+def test_has_complete_answer_requires_newline_terminated_fields():
+    assert not _has_complete_answer("SELECTED: B\nREASONING: Two plus")
+    assert not _has_complete_answer("REASONING: Two plus two is four.\n")
+    assert _has_complete_answer("SELECTED: B\nREASONING: Two plus two is four.\n")
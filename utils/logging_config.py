@@ -1,7 +1,10 @@
 """Structured logging configuration for AI QA Validator."""
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 from contextvars import ContextVar
 
@@ -9,43 +12,47 @@ from contextvars import ContextVar
 # Context variable for request ID tracking
 request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 
+# Background listener writing queued records to the console, started by configure_logging
+_listener: Optional[QueueListener] = None
 
-class StructuredFormatter(logging.Formatter):
-    """Custom formatter that adds request ID and structured fields to log records."""
+# Record factory in place before ours, which ours wraps
+_base_record_factory = logging.getLogRecordFactory()
+
+
+def _record_factory(*args, **kwargs) -> logging.LogRecord:
+    """
+    Create a log record stamped with the request ID of the logging context.
     
-    def format(self, record: logging.LogRecord) -> str:
-        """
-        Format log record with structured fields.
-        
-        Adds request_id from context if available.
-        """
-        # Get request ID from context
-        request_id = request_id_var.get()
-        if request_id:
-            record.request_id = request_id
-        else:
-            record.request_id = "no-request-id"
-        
-        # Add question context if available
-        if not hasattr(record, 'question_number'):
-            record.question_number = ""
-        
-        return super().format(record)
+    Runs once per record in the emitting task, so the ID is captured before
+    the record reaches the listener thread where the context is gone.
+    """
+    record = _base_record_factory(*args, **kwargs)
+    record.request_id = request_id_var.get() or "no-request-id"
+    return record
 
 
 def configure_logging(log_level: str = "INFO") -> None:
     """
     Configure structured logging for the application.
     
+    Records are handed to a queue and written to stdout by a background
+    listener thread, so logging calls never block on console I/O.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    # Stamp every record with the request ID when it is created
+    logging.setLogRecordFactory(_record_factory)
+    
     # Create formatter with structured fields
-    formatter = StructuredFormatter(
+    formatter = logging.Formatter(
         fmt='%(asctime)s - [%(request_id)s] - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    # Stop the listener of a previous configuration
+    shutdown_logging()
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
@@ -58,7 +65,14 @@ def configure_logging(log_level: str = "INFO") -> None:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    
+    # Route records through a queue drained by the listener thread
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    root_logger.addHandler(queue_handler)
+    _listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
     
     # Set level for third-party loggers to reduce noise
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -66,6 +80,23 @@ def configure_logging(log_level: str = "INFO") -> None:
     logging.getLogger("google").setLevel(logging.WARNING)
 
 
+@atexit.register
+def shutdown_logging() -> None:
+    """Stop the queue listener, flushing queued records, and write later records directly."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, QueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        root_logger.addHandler(handler)
+    _listener = None
+
+
 def set_request_id(request_id: str) -> None:
     """
     Set the request ID in the current context.
@@ -1,7 +1,9 @@
 """Worker pool for concurrent question processing."""
 
+from workers.answer_cache import AnswerCache
 from workers.question_processor import QuestionProcessor
 
 __all__ = [
+    "AnswerCache",
     "QuestionProcessor"
 ]
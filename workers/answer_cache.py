@@ -0,0 +1,169 @@
+"""Exact-match and semantic cache of answer results."""
+
+import dataclasses
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from models.schemas import AnswerResultInternal, QuestionItem
+from agents.semantic_cache import canonical_text, question_identity_key
+
+
+logger = logging.getLogger(__name__)
+
+
+# Async callable returning an embedding vector for a text
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+def _embedding_text(question: QuestionItem) -> str:
+    """Render a question and its options, in order, as the text to embed."""
+    lines = [canonical_text(question.content)]
+    lines.extend(f"{chr(ord('A') + i)}. {canonical_text(answer.content)}" for i, answer in enumerate(question.answers))
+    return "\n".join(lines)
+
+
+class AnswerCache:
+    """
+    LRU cache of answer results looked up before a question reaches the validator.
+    
+    The exact tier is keyed by question_identity_key, so it only matches the
+    same content, title and ordered answers, with case kept.
+    The optional semantic tier embeds the question with its options and
+    returns the result of the most similar cached question above a cosine
+    similarity threshold. The embedding text includes options in order, so a
+    near-identical question with reordered options scores lower.
+    
+    All methods run on the event loop without awaiting between reads and
+    writes, so no lock is needed.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        embed: Optional[Embedder] = None,
+        similarity_threshold: float = 0.97
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached results (default: 10000)
+            embed: Async embedding function enabling the semantic tier (default: exact matches only)
+            similarity_threshold: Minimum cosine similarity for a semantic hit (default: 0.97)
+        """
+        self.max_entries = max_entries
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, AnswerResultInternal]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+        # Semantic tier: one L2-normalized embedding row per slot, allocated on first use
+        self._embeddings: Optional[np.ndarray] = None
+        self._slot_keys: List[Optional[str]] = [None] * max_entries
+        self._key_slots: Dict[str, int] = {}
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        
+        logger.info(
+            f"AnswerCache initialized with max_entries={max_entries}, "
+            f"semantic={'on' if embed is not None else 'off'}"
+        )
+    
+    @staticmethod
+    def _key(question: QuestionItem) -> str:
+        """Build the exact-match key for a question."""
+        return question_identity_key(question)
+    
+    async def _embed(self, question: QuestionItem) -> Optional[np.ndarray]:
+        """Embed a question for the semantic tier, or return None if unavailable."""
+        if self.embed is None:
+            return None
+        try:
+            vector = np.asarray(await self.embed(_embedding_text(question)), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding failed for question {question.questionNumber}, using exact match only: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    def _semantic_match(self, embedding: np.ndarray) -> Optional[str]:
+        """Return the key of the most similar cached question above the threshold."""
+        if self._embeddings is None or not self._key_slots:
+            return None
+        scores = self._embeddings @ embedding
+        slot = int(scores.argmax())
+        if scores[slot] < self.similarity_threshold:
+            return None
+        return self._slot_keys[slot]
+    
+    async def get(self, question: QuestionItem) -> Tuple[Optional[AnswerResultInternal], Optional[np.ndarray]]:
+        """
+        Look up a cached result for a question.
+        
+        Args:
+            question: The question to look up
+        
+        Returns:
+            Tuple of the cached result rewritten for this question (or None on a
+            miss) and the question's embedding to pass back to put
+        """
+        key = self._key(question)
+        embedding = None
+        if key not in self._entries:
+            embedding = await self._embed(question)
+            if embedding is not None:
+                key = self._semantic_match(embedding) or key
+        
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None, embedding
+        
+        self.hits += 1
+        self._entries.move_to_end(key)
+        logger.debug("Answer cache hit for question %s", question.questionNumber)
+        return dataclasses.replace(
+            result,
+            questionNumber=question.questionNumber,
+            processingTimeMs=0,
+            cached=True
+        ), embedding
+    
+    def put(self, question: QuestionItem, result: AnswerResultInternal, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Store a successful result for a question, evicting the least recently used entry.
+        
+        Args:
+            question: The question the result answers
+            result: The validated result
+            embedding: Embedding returned by get, enabling semantic lookups of this entry
+        """
+        if self.max_entries <= 0:
+            return
+        key = self._key(question)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        elif len(self._entries) >= self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._release_slot(evicted_key)
+        self._entries[key] = result
+        
+        if embedding is not None:
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+            slot = self._key_slots.get(key)
+            if slot is None:
+                slot = self._free_slots.pop()
+                self._key_slots[key] = slot
+                self._slot_keys[slot] = key
+            self._embeddings[slot] = embedding
+    
+    def _release_slot(self, key: str) -> None:
+        """Free the embedding slot of an evicted entry."""
+        slot = self._key_slots.pop(key, None)
+        if slot is None:
+            return
+        self._embeddings[slot] = 0
+        self._slot_keys[slot] = None
+        self._free_slots.append(slot)
@@ -1,33 +1,83 @@
 """Question processor with concurrent worker pool."""
 
 import asyncio
+import dataclasses
 import logging
 import time
-from typing import List
-from models.schemas import QuestionItem, AnswerResult
+from collections import defaultdict
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+from models.schemas import QuestionItem, AnswerResultInternal
 from agents.multi_agent_validator import MultiAgentValidator
+from agents.semantic_cache import question_identity_key
+from workers.answer_cache import AnswerCache
+from utils.logging_config import get_request_id, set_request_id
 
 
 logger = logging.getLogger(__name__)
 
 
+# Callback receiving the index of a question and its result as soon as it is ready
+ResultCallback = Callable[[int, AnswerResultInternal], None]
+
+
+class _Job(NamedTuple):
+    """A question waiting in the worker queue."""
+    question: QuestionItem
+    future: "asyncio.Future[AnswerResultInternal]"
+    request_id: Optional[str]
+    batchable: bool = True
+
+
+class _JobQueue(asyncio.Queue):
+    """FIFO queue of jobs that can also return a job to its head."""
+    
+    def put_front_nowait(self, job: _Job) -> None:
+        """Put a job back at the head of the queue, waking an idle worker to take it."""
+        self.put_nowait(job)
+        # put_nowait appended the job; the woken worker only reads the queue after this returns
+        self._queue.rotate(1)
+
+
 class QuestionProcessor:
-    """Processes multiple questions concurrently using a worker pool."""
+    """
+    Processes multiple questions concurrently using a worker pool.
     
-    def __init__(self, validator: MultiAgentValidator, max_concurrent_workers: int = 5):
+    A fixed set of long-lived worker coroutines pulls questions from a shared
+    queue, so concurrency is bounded by the worker count across all requests.
+    """
+    
+    def __init__(
+        self,
+        validator: MultiAgentValidator,
+        max_concurrent_workers: int = 5,
+        batch_size: int = 1,
+        batch_wait_ms: int = 50,
+        batch_max_chars: int = 24000,
+        answer_cache: Optional[AnswerCache] = None
+    ):
         """
         Initialize the question processor.
         
         Args:
             validator: The multi-agent validator instance
             max_concurrent_workers: Maximum number of concurrent workers (default: 5)
+            batch_size: Questions per batched first-pass Gemini call, 1 disables batching (default: 1)
+            batch_wait_ms: How long a worker waits for more questions to fill a batch (default: 50)
+            batch_max_chars: Prompt size budget of a batch in characters (default: 24000)
+            answer_cache: Cache of results checked before validating a question (default: disabled)
         """
         self.validator = validator
         self.max_concurrent_workers = max_concurrent_workers
-        self.semaphore = asyncio.Semaphore(max_concurrent_workers)
-        logger.info(f"QuestionProcessor initialized with max_concurrent_workers={max_concurrent_workers}")
+        self.batch_size = batch_size
+        self.batch_wait_ms = batch_wait_ms
+        self.batch_max_chars = batch_max_chars
+        self.answer_cache = answer_cache
+        self._queue = _JobQueue()
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        logger.info("QuestionProcessor initialized with max_concurrent_workers=%d", max_concurrent_workers)
     
-    async def process_questions(self, questions: List[QuestionItem]) -> List[AnswerResult]:
+    async def process_questions(self, questions: List[QuestionItem]) -> List[AnswerResultInternal]:
         """
         Process multiple questions concurrently while maintaining order.
         
@@ -35,100 +85,352 @@ class QuestionProcessor:
             questions: List of questions to process
             
         Returns:
-            List of AnswerResult objects in the same order as input questions
-        """
-        logger.info(f"Processing {len(questions)} questions with up to {self.max_concurrent_workers} concurrent workers")
-        
-        # Create tasks for all questions
-        tasks = [self._process_single_question(question) for question in questions]
-        
-        # Execute all tasks concurrently and gather results
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Convert any exceptions to error results
-        final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                question_num = questions[i].questionNumber
-                logger.error(
-                    f"Question {question_num} failed with exception: {result}",
-                    extra={'question_number': question_num}
-                )
-                final_results.append(
-                    AnswerResult(
-                        questionNumber=question_num,
-                        error=str(result),
-                        validationIterations=0,
-                        processingTimeMs=0
-                    )
-                )
+            List of AnswerResultInternal objects in the same order as input questions
+        """
+        final_results: List[Optional[AnswerResultInternal]] = [None] * len(questions)
+        await self._process_all(questions, final_results.__setitem__)
+        return final_results
+    
+    async def iter_results(self, questions: List[QuestionItem]) -> AsyncIterator[Tuple[int, AnswerResultInternal]]:
+        """
+        Process multiple questions concurrently, yielding each result as soon as it is ready.
+        
+        Args:
+            questions: List of questions to process
+            
+        Yields:
+            Tuples of (index into questions, AnswerResultInternal) in completion order
+        """
+        queue: "asyncio.Queue[Optional[Tuple[int, AnswerResultInternal]]]" = asyncio.Queue()
+        
+        async def run() -> None:
+            try:
+                await self._process_all(questions, lambda i, result: queue.put_nowait((i, result)))
+            finally:
+                queue.put_nowait(None)
+        
+        # Processing runs in its own task so the consumer never yields from inside the task group
+        runner = asyncio.create_task(run())
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+    
+    async def _process_all(self, questions: List[QuestionItem], emit: ResultCallback) -> None:
+        """
+        Process questions, calling emit(index, result) as each one finishes.
+        
+        Identical questions are validated once and the result is copied to
+        every duplicate under its own question number.
+        
+        Args:
+            questions: List of questions to process
+            emit: Callback receiving the index and result of each question
+        """
+        logger.info(
+            "Processing %d questions with up to %d concurrent workers",
+            len(questions), self.max_concurrent_workers
+        )
+        
+        # Group duplicate questions so each distinct question is validated once
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for i, question in enumerate(questions):
+            groups[question_identity_key(question)].append(i)
+        group_indices = list(groups.values())
+        unique_questions = [questions[indices[0]] for indices in group_indices]
+        if len(unique_questions) < len(questions):
+            logger.info("Deduplicated %d questions to %d unique", len(questions), len(unique_questions))
+        
+        def emit_group(j: int, result: AnswerResultInternal) -> None:
+            # Fan each result back out to every original position
+            indices = group_indices[j]
+            emit(indices[0], result)
+            for i in indices[1:]:
+                emit(i, dataclasses.replace(result, questionNumber=questions[i].questionNumber))
+        
+        await self._process_with_cache(unique_questions, emit_group)
+        
+        logger.info("Completed processing %d questions", len(questions))
+    
+    async def _process_with_cache(self, questions: List[QuestionItem], emit: ResultCallback) -> None:
+        """
+        Process distinct questions, serving answer cache hits without calling the validator.
+        
+        Successful results of cache misses are added to the cache.
+        
+        Args:
+            questions: List of distinct questions to process
+            emit: Callback receiving the index and result of each question
+        """
+        if self.answer_cache is None:
+            await self._process_uncached(questions, emit)
+            return
+        
+        lookups = await asyncio.gather(*(self.answer_cache.get(question) for question in questions))
+        miss_indices = []
+        for i, (cached_result, _) in enumerate(lookups):
+            if cached_result is None:
+                miss_indices.append(i)
             else:
-                final_results.append(result)
+                emit(i, cached_result)
+        if len(miss_indices) < len(questions):
+            logger.info("Answer cache served %d of %d questions", len(questions) - len(miss_indices), len(questions))
         
-        logger.info(f"Completed processing {len(questions)} questions")
-        return final_results
+        def emit_miss(j: int, result: AnswerResultInternal) -> None:
+            i = miss_indices[j]
+            if result.error is None:
+                self.answer_cache.put(questions[i], result, lookups[i][1])
+            emit(i, result)
+        
+        await self._process_uncached([questions[i] for i in miss_indices], emit_miss)
     
-    async def _process_single_question(self, question: QuestionItem) -> AnswerResult:
+    async def _process_uncached(self, questions: List[QuestionItem], emit: ResultCallback) -> None:
         """
-        Process a single question through the validation loop.
+        Run questions through the worker pool, emitting each result as soon as it is ready.
         
-        Uses a semaphore to limit concurrent workers.
+        Args:
+            questions: List of questions to process
+            emit: Callback receiving the index and result of each question
+        """
+        self.start()
+        futures = [self._submit(question) for question in questions]
+        index_of = {future: i for i, future in enumerate(futures)}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    emit(index_of[future], future.result())
+        finally:
+            # Workers skip questions whose caller has gone away
+            for future in pending:
+                future.cancel()
+    
+    def _submit(self, question: QuestionItem) -> "asyncio.Future[AnswerResultInternal]":
+        """Queue a question for the worker pool and return the future of its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Job(question, future, get_request_id()))
+        return future
+    
+    def start(self) -> None:
+        """Start the worker coroutines on the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+        
+        # Workers and queue are bound to one event loop; start afresh under a new one
+        self._loop = loop
+        self._queue = _JobQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"question-worker-{i}")
+            for i in range(self.max_concurrent_workers)
+        ]
+        logger.info("Started %d question workers", len(self._workers))
+    
+    async def stop(self) -> None:
+        """Stop the worker coroutines and cancel questions still waiting in the queue."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+    
+    async def _worker(self) -> None:
+        """
+        Pull queued questions and process them until cancelled.
+        
+        With batching enabled, a worker collects questions arriving within
+        batch_wait_ms of the first, up to batch_size and batch_max_chars, and
+        sends them in one first-pass call.
+        """
+        jobs: List[_Job] = []
+        try:
+            while True:
+                job = await self._queue.get()
+                if job.future.done():
+                    # The caller has gone away
+                    continue
+                
+                jobs = [job]
+                try:
+                    if job.batchable and self.batch_size > 1:
+                        await self._collect_batch(jobs)
+                    
+                    # Log under the request that submitted the (first) question
+                    set_request_id(job.request_id)
+                    if len(jobs) > 1:
+                        await self._run_batch(jobs)
+                    else:
+                        await self._run_job(job)
+                except Exception as e:
+                    # Keep the worker alive; fail only the questions it was handling
+                    for failed_job in jobs:
+                        self._resolve(failed_job, self._error_result(failed_job.question, e))
+                jobs = []
+        finally:
+            # Never leave a caller waiting on a question this worker dropped
+            for job in jobs:
+                job.future.cancel()
+    
+    async def _collect_batch(self, jobs: List[_Job]) -> None:
+        """
+        Add batchable jobs arriving within the batch window to jobs.
+        
+        The first job that does not fit the batch goes back to the head of the
+        queue and ends collection, so an idle worker can start it right away.
+        
+        Args:
+            jobs: The batch so far, starting with its first job
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait_ms / 1000
+        chars = self.validator.prompt_size(jobs[0].question)
+        
+        while len(jobs) < self.batch_size and chars < self.batch_max_chars:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    next_job = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                next_job = self._queue.get_nowait()
+            
+            if next_job.future.done():
+                continue
+            size = self.validator.prompt_size(next_job.question)
+            if not next_job.batchable or chars + size > self.batch_max_chars:
+                self._queue.put_front_nowait(next_job)
+                break
+            jobs.append(next_job)
+            chars += size
+    
+    @staticmethod
+    def _error_result(question: QuestionItem, error: Exception) -> AnswerResultInternal:
+        """Log an unexpected failure and build the error result for a question."""
+        logger.error(
+            "Question %s failed with exception: %s: %.200s",
+            question.questionNumber, type(error).__name__, error,
+            exc_info=error if logger.isEnabledFor(logging.DEBUG) else None,
+            extra={'question_number': question.questionNumber}
+        )
+        return AnswerResultInternal(
+            questionNumber=question.questionNumber,
+            error=str(error),
+            validationIterations=0,
+            processingTimeMs=0
+        )
+    
+    @staticmethod
+    def _resolve(job: _Job, result: AnswerResultInternal) -> None:
+        """Hand a result to the caller waiting on a job, if it is still waiting."""
+        if not job.future.done():
+            job.future.set_result(result)
+    
+    async def _run_job(self, job: _Job) -> None:
+        """Process a single queued question and resolve its future."""
+        try:
+            result = await self._process_single_question(job.question)
+        except Exception as e:
+            result = self._error_result(job.question, e)
+        self._resolve(job, result)
+    
+    async def _run_batch(self, jobs: List[_Job]) -> None:
+        """
+        Process queued questions with one batched validation pass.
+        
+        Questions that do not reach consensus in the batched pass (or whose
+        batch fails) are queued again for the individual validation loop.
+        
+        Args:
+            jobs: The queued questions to process together
+        """
+        questions = [job.question for job in jobs]
+        start_ns = time.monotonic_ns()
+        try:
+            validation_results = await self.validator.validate_questions_batch(questions)
+        except Exception as e:
+            logger.warning(
+                "Batch of %d questions failed, falling back to individual validation: %s: %.200s",
+                len(questions), type(e).__name__, e
+            )
+            validation_results = [None] * len(questions)
+        processing_time_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+        
+        for job, validation_result in zip(jobs, validation_results):
+            if validation_result is None:
+                # Run the full consensus loop on the next free worker
+                self._queue.put_nowait(job._replace(batchable=False))
+            else:
+                self._resolve(job, AnswerResultInternal(
+                    questionNumber=job.question.questionNumber,
+                    selectedAnswer=validation_result.selected_answer,
+                    validationIterations=validation_result.iterations,
+                    processingTimeMs=processing_time_ms
+                ))
+    
+    async def _process_single_question(self, question: QuestionItem) -> AnswerResultInternal:
+        """
+        Process a single question through the validation loop.
         
         Args:
             question: The question to process
             
         Returns:
-            AnswerResult with the validated answer or error
+            AnswerResultInternal with the validated answer or error
         """
-        async with self.semaphore:
+        logger.debug(
+            "Worker started question %s",
+            question.questionNumber,
+            extra={'question_number': question.questionNumber}
+        )
+        start_ns = time.monotonic_ns()
+        
+        try:
+            # Gemini calls are awaited directly; the worker count bounds concurrency
+            validation_result = await self.validator.validate_question(question)
+            
+            # Calculate processing time
+            processing_time_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+            
+            # Create successful result
+            result = AnswerResultInternal(
+                questionNumber=question.questionNumber,
+                selectedAnswer=validation_result.selected_answer,
+                validationIterations=validation_result.iterations,
+                processingTimeMs=processing_time_ms
+            )
+            
             logger.debug(
-                f"Worker acquired for question {question.questionNumber}",
+                "Question %s completed in %dms with %d iterations",
+                question.questionNumber, processing_time_ms, validation_result.iterations,
                 extra={'question_number': question.questionNumber}
             )
-            start_time = time.time()
             
-            try:
-                # Run the synchronous validation in a thread pool to avoid blocking
-                loop = asyncio.get_event_loop()
-                validation_result = await loop.run_in_executor(
-                    None,
-                    self.validator.validate_question,
-                    question
-                )
-                
-                # Calculate processing time
-                processing_time_ms = int((time.time() - start_time) * 1000)
-                
-                # Create successful result
-                result = AnswerResult(
-                    questionNumber=question.questionNumber,
-                    selectedAnswer=validation_result.selected_answer,
-                    validationIterations=validation_result.iterations,
-                    processingTimeMs=processing_time_ms
-                )
-                
-                logger.debug(
-                    f"Question {question.questionNumber} completed in {processing_time_ms}ms "
-                    f"with {validation_result.iterations} iterations",
-                    extra={'question_number': question.questionNumber}
-                )
-                
-                return result
-                
-            except Exception as e:
-                # Calculate processing time even for failures
-                processing_time_ms = int((time.time() - start_time) * 1000)
-                
-                logger.error(
-                    f"Question {question.questionNumber} failed after {processing_time_ms}ms: {e}",
-                    exc_info=True,
-                    extra={'question_number': question.questionNumber}
-                )
-                
-                # Create error result
-                return AnswerResult(
-                    questionNumber=question.questionNumber,
-                    error=str(e),
-                    validationIterations=0,
-                    processingTimeMs=processing_time_ms
-                )
+            return result
+            
+        except Exception as e:
+            # Calculate processing time even for failures
+            processing_time_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+            
+            # One-line summary; the traceback only when debugging
+            logger.error(
+                "Question %s failed after %dms: %s: %.200s",
+                question.questionNumber, processing_time_ms, type(e).__name__, e,
+                exc_info=logger.isEnabledFor(logging.DEBUG),
+                extra={'question_number': question.questionNumber}
+            )
+            
+            # Create error result
+            return AnswerResultInternal(
+                questionNumber=question.questionNumber,
+                error=str(e),
+                validationIterations=0,
+                processingTimeMs=processing_time_ms
+            )